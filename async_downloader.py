@@ -0,0 +1,308 @@
+"""
+Asyncio client for Hindalco PDF Downloader
+Same public methods as HindalcoPDFDownloader plus a concurrent download_range
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+import aiohttp
+from config import *
+import metrics
+from date_index import OUTCOME_DOWNLOADED, OUTCOME_MISSING
+from downloader import DownloaderBase, PartFile, IncompleteDownloadError, backoff_delay, is_complete_pdf, parse_content_range
+
+logger = logging.getLogger(__name__)
+
+class AsyncRateLimiter:
+    """Per-host limiter spacing requests at least 1/rate seconds apart"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self.lock = asyncio.Lock()
+        self.next_slot = {}
+
+    async def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        async with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class AsyncHindalcoPDFDownloader(DownloaderBase):
+    """Use as `async with AsyncHindalcoPDFDownloader() as downloader:` to share one connection pool"""
+
+    def __init__(self, concurrency=ASYNC_CONCURRENCY, rate_limit=None, base_url=None, archive_dir=ARCHIVE_DIR):
+        super().__init__(base_url=base_url, archive_dir=archive_dir)
+        self.concurrency = concurrency
+        self.rate_limiter = AsyncRateLimiter(rate_limit)
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def probe_pdf(self, url):
+        """HEAD the url and return status, validators and size without fetching the body"""
+        result = {'status': None, 'etag': None, 'last_modified': None, 'content_length': None, 'is_pdf': False}
+        try:
+            await self.rate_limiter.wait(url)
+            sent = time.perf_counter()
+            async with self.session.head(url, allow_redirects=True) as response:
+                metrics.record_request('HEAD', response.status, time.perf_counter() - sent)
+                result['status'] = response.status
+                result['etag'] = response.headers.get('ETag')
+                result['last_modified'] = response.headers.get('Last-Modified')
+                result['is_pdf'] = 'pdf' in response.headers.get('Content-Type', '').lower()
+                result['content_length'] = response.content_length
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"HEAD request failed: {str(e)}")
+            metrics.record_request('HEAD', None, 0)
+        return result
+
+    async def fetch_pdf(self, url, filepath, validators=None):
+        """Async counterpart of HindalcoPDFDownloader.fetch_pdf"""
+        result = {'success': False, 'not_modified': False, 'status': None, 'etag': None, 'last_modified': None}
+        headers = self.conditional_headers(validators)
+        headers['Accept-Encoding'] = 'identity'
+        part = PartFile(filepath)
+        expected_size = None
+        resume_validator = None
+
+        try:
+            for attempt in range(MAX_RETRIES):
+                responded = False
+                try:
+                    logger.info(f"Attempting to download from: {url} (Attempt {attempt + 1}/{MAX_RETRIES})")
+                    request_headers = dict(headers)
+                    if part.size and resume_validator:
+                        request_headers['Range'] = f"bytes={part.size}-"
+                        request_headers['If-Range'] = resume_validator
+                        logger.info(f"Resuming download at byte {part.size}")
+                    await self.rate_limiter.wait(url)
+                    sent = time.perf_counter()
+                    async with self.session.get(url, headers=request_headers) as response:
+                        responded = True
+                        metrics.record_request('GET', response.status, time.perf_counter() - sent)
+                        result['status'] = response.status
+                        result['etag'] = response.headers.get('ETag')
+                        result['last_modified'] = response.headers.get('Last-Modified')
+
+                        if response.status == 304:
+                            logger.info(f"PDF not modified since last check: {filepath}")
+                            result['not_modified'] = True
+                            result['etag'] = result['etag'] or validators.get('etag')
+                            result['last_modified'] = result['last_modified'] or validators.get('last_modified')
+                            return result
+
+                        if response.status == 404:
+                            logger.info("PDF not available for this date (404 Not Found)")
+                            return result
+
+                        if response.status in (200, 206):
+                            content_type = response.headers.get('Content-Type', '').lower()
+                            if 'pdf' not in content_type:
+                                logger.warning(f"Invalid content type: {content_type} — not saving file.")
+                                return result
+
+                            if response.status == 206:
+                                start, expected_size = parse_content_range(response.headers.get('Content-Range'))
+                                if start != part.size:
+                                    raise IncompleteDownloadError(f"Server resumed at byte {start}, expected {part.size}")
+                                part.open(resume=True)
+                            else:
+                                first_bytes = await response.content.readexactly(5)
+                                if first_bytes != b'%PDF-':
+                                    logger.warning("File content does not start with '%PDF-', skipping save.")
+                                    return result
+                                expected_size = response.content_length
+                                part.open(resume=False)
+                                part.write(first_bytes)
+
+                            result['status'] = 200
+                            resume_validator = result['etag'] or result['last_modified']
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                part.write(chunk)
+
+                            result['sha256'] = await asyncio.to_thread(part.commit, expected_size)
+                            result['size'] = part.size
+                            metrics.record_transfer(part.size - (start if response.status == 206 else 0),
+                                                    time.perf_counter() - sent)
+                            logger.info(f"Successfully downloaded PDF: {filepath} ({part.size} bytes, sha256 {result['sha256'][:12]})")
+                            result['success'] = True
+                            return result
+
+                        logger.warning(f"Unexpected status code: {response.status}")
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, asyncio.IncompleteReadError, IncompleteDownloadError) as e:
+                    logger.error(f"Request failed: {str(e)}")
+                    if not responded:
+                        metrics.record_request('GET', None, 0)
+                    result['status'] = None
+                    part.close()
+                    if not resume_validator or (expected_size is not None and part.size >= expected_size):
+                        part.discard()
+
+                if attempt < MAX_RETRIES - 1:
+                    metrics.inc('hindalco_http_retries_total', method='GET')
+                    delay = backoff_delay(attempt)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+
+            logger.error("Max retries reached. Download failed.")
+            return result
+
+        finally:
+            # Also runs on cancellation, so an aborted transfer never leaves a partial file behind
+            if not result['success']:
+                part.discard()
+
+    async def download_pdf(self, url, filepath):
+        return (await self.fetch_pdf(url, filepath))['success']
+
+    async def _record(self, date, outcome, **fields):
+        await asyncio.to_thread(self.index.record, date, outcome, **fields)
+
+    async def _record_outcome(self, date, url, result, **extra):
+        await asyncio.to_thread(self.record_outcome, date, url, result, **extra)
+
+    async def revalidate(self, date, url, filepath, entry):
+        """Check an existing file against the server copy and refresh it if it changed"""
+        if entry and (entry.get('etag') or entry.get('last_modified')):
+            result = await self.fetch_pdf(url, filepath, validators=entry)
+            if result['success']:
+                logger.info(f"Server copy changed, refreshed: {filepath}")
+            if result['success'] or result['not_modified']:
+                await self._record_outcome(date, url, result)
+            return True
+
+        probe = await self.probe_pdf(url)
+        if probe['status'] != 200 or not probe['is_pdf']:
+            return True
+
+        local_size = os.path.getsize(filepath)
+        if probe['content_length'] is not None and probe['content_length'] != local_size:
+            logger.info(f"Server copy size {probe['content_length']} differs from local {local_size}, re-downloading")
+            result = await self.fetch_pdf(url, filepath)
+            if result['success']:
+                await self._record_outcome(date, url, result)
+            return True
+
+        await self._record(date, OUTCOME_DOWNLOADED, status=probe['status'], url=url,
+                           etag=probe['etag'], last_modified=probe['last_modified'])
+        return True
+
+    async def resolve_and_fetch(self, date, filepath, head_first=False):
+        """Try candidate URL templates best first until one serves the PDF; returns (result, url)"""
+        result, url = None, None
+        for template, url in self.resolver.candidates(date):
+            if head_first:
+                probe = await self.probe_pdf(url)
+                if probe['status'] == 404:
+                    result = {'success': False, 'not_modified': False, 'status': 404, 'etag': None, 'last_modified': None}
+                    await asyncio.to_thread(self.record_template, date, template, result)
+                    continue
+
+            result = await self.fetch_pdf(url, filepath)
+            await asyncio.to_thread(self.record_template, date, template, result)
+            if result['status'] != 404:
+                break
+        return result, url
+
+    async def download_for_date(self, date, force_probe=False):
+        logger.info(f"Checking for PDF for date: {date.strftime('%Y-%m-%d')}")
+        filename = self.construct_filename(date)
+        dir_path = self.create_directory_structure(date)
+        filepath = os.path.join(dir_path, filename)
+        entry = self.index.get(date)
+
+        if os.path.exists(filepath) and not is_complete_pdf(filepath):
+            logger.warning(f"Existing file is truncated, re-downloading: {filepath}")
+            os.remove(filepath)
+
+        if os.path.exists(filepath):
+            if self.needs_revalidation(date, entry):
+                return await self.revalidate(date, self.known_url(date, entry), filepath, entry)
+            logger.info(f"File already exists: {filepath}")
+            return True
+
+        if not force_probe and not self.index.should_probe(date):
+            logger.info(f"Skipping {date.strftime('%Y-%m-%d')}: recorded as missing in date index")
+            return False
+
+        head_first = bool(entry and entry.get('outcome') == OUTCOME_MISSING)
+        result, url = await self.resolve_and_fetch(date, filepath, head_first=head_first)
+        captured = {'captured_at': datetime.now().isoformat(timespec='seconds')} if result['success'] else {}
+        await self._record_outcome(date, url, result, **captured)
+
+        if result['success']:
+            logger.info(f"Download completed successfully for {date.strftime('%Y-%m-%d')}")
+        else:
+            logger.info(f"No valid PDF available for {date.strftime('%Y-%m-%d')}")
+
+        return result['success']
+
+    async def download_today(self):
+        return await self.download_for_date(datetime.now())
+
+    async def download_range(self, start, end):
+        """Download every date from start to end inclusive; returns {date: success}
+
+        At most `concurrency` dates are in flight. Cancelling the caller cancels
+        every pending download.
+        """
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(date):
+            async with semaphore:
+                return await self.download_for_date(date)
+
+        tasks = [asyncio.create_task(bounded(date)) for date in dates]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return dict(zip(dates, results))
+
+async def download_range(start, end, **kwargs):
+    async with AsyncHindalcoPDFDownloader(**kwargs) as downloader:
+        return await downloader.download_range(start, end)
+
+def main():
+    logger.info("Starting async Hindalco PDF Downloader")
+
+    async def run():
+        async with AsyncHindalcoPDFDownloader() as downloader:
+            return await downloader.download_today()
+
+    if asyncio.run(run()):
+        logger.info("Download process completed successfully")
+    else:
+        logger.info("No file downloaded (file may not be available or is invalid)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Concurrent backfill for Hindalco PDF Downloader
+Spreads dates across a bounded worker pool sharing one pooled session
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from downloader import HindalcoPDFDownloader
+from config import BACKFILL_WORKERS, RATE_LIMIT_PER_HOST
+
+logger = logging.getLogger(__name__)
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_backfill(days, workers=BACKFILL_WORKERS, rate_limit=RATE_LIMIT_PER_HOST, end_date=None, **downloader_kwargs):
+    """Download missing files for the last N days using a pool of workers
+
+    Extra keyword arguments (base_url, archive_dir, on_download) are passed to HindalcoPDFDownloader.
+    """
+    end_date = end_date or datetime.now()
+    dates = [end_date - timedelta(days=i) for i in range(days)]
+    workers = max(1, min(workers, len(dates) or 1))
+
+    downloader = HindalcoPDFDownloader(pool_size=workers, rate_limit=rate_limit, **downloader_kwargs)
+    latencies = []
+    success_count = 0
+    failures = 0
+
+    def timed_download(date):
+        started = time.perf_counter()
+        success = downloader.download_for_date(date)
+        return success, time.perf_counter() - started
+
+    logger.info(f"Starting backfill of {len(dates)} days with {workers} workers ({rate_limit} req/s per host)")
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(timed_download, date): date for date in dates}
+        for future in as_completed(futures):
+            date = futures[future]
+            try:
+                success, latency = future.result()
+            except Exception as e:
+                logger.error(f"Backfill failed for {date.strftime('%Y-%m-%d')}: {str(e)}")
+                failures += 1
+                continue
+            latencies.append(latency)
+            if success:
+                success_count += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        'days': len(dates),
+        'workers': workers,
+        'success_count': success_count,
+        'failures': failures,
+        'elapsed': elapsed,
+        'throughput': len(dates) / elapsed if elapsed else 0.0,
+        'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p95': _percentile(latencies, 95),
+        'latency_max': max(latencies) if latencies else 0.0,
+    }
+
+def print_backfill_report(stats):
+    """Print aggregate throughput and latency for a finished backfill"""
+    print(f"Backfill completed: {stats['success_count']}/{stats['days']} files downloaded")
+    print(f"  Workers:    {stats['workers']}")
+    print(f"  Errors:     {stats['failures']}")
+    print(f"  Elapsed:    {stats['elapsed']:.2f}s")
+    print(f"  Throughput: {stats['throughput']:.2f} dates/s")
+    print(f"  Latency:    avg {stats['latency_avg']:.2f}s, p50 {stats['latency_p50']:.2f}s, "
+          f"p95 {stats['latency_p95']:.2f}s, max {stats['latency_max']:.2f}s")
@@ -0,0 +1,4 @@
+"""
+Benchmarks for Hindalco PDF Downloader
+Run from the repository root, e.g. `python -m benchmarks.download`
+"""
@@ -0,0 +1,80 @@
+"""
+Benchmark: serial sync downloads vs thread-pool backfill vs the async client
+Serves Downloads/ through the local stub with simulated network latency
+
+Usage: python -m benchmarks.download [--start 2025-06-01] [--end 2025-07-31] [--latency 0.05]
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from config import ASYNC_CONCURRENCY, BACKFILL_WORKERS
+from downloader import HindalcoPDFDownloader
+from async_downloader import AsyncHindalcoPDFDownloader
+from backfill import run_backfill
+from benchmarks.stub_server import start_stub_server
+
+def bench_sync_serial(base_url, dates):
+    with tempfile.TemporaryDirectory() as archive_dir:
+        downloader = HindalcoPDFDownloader(base_url=base_url, archive_dir=archive_dir)
+        started = time.perf_counter()
+        hits = sum(1 for date in dates if downloader.download_for_date(date))
+        return time.perf_counter() - started, hits
+
+def bench_sync_pool(base_url, dates, workers):
+    with tempfile.TemporaryDirectory() as archive_dir:
+        stats = run_backfill(len(dates), workers=workers, rate_limit=None, end_date=dates[-1],
+                             base_url=base_url, archive_dir=archive_dir)
+        return stats['elapsed'], stats['success_count']
+
+def bench_async(base_url, dates, concurrency):
+    async def run(archive_dir):
+        async with AsyncHindalcoPDFDownloader(concurrency=concurrency, base_url=base_url,
+                                              archive_dir=archive_dir) as downloader:
+            started = time.perf_counter()
+            results = await downloader.download_range(dates[0], dates[-1])
+            return time.perf_counter() - started, sum(results.values())
+
+    with tempfile.TemporaryDirectory() as archive_dir:
+        return asyncio.run(run(archive_dir))
+
+def main():
+    parser = argparse.ArgumentParser(description='Download path benchmark')
+    parser.add_argument('--start', default='2025-06-01', help='First date (YYYY-MM-DD)')
+    parser.add_argument('--end', default='2025-07-31', help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated per-request latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=ASYNC_CONCURRENCY)
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    end = datetime.strptime(args.end, '%Y-%m-%d')
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    server, base_url = start_stub_server(latency=args.latency)
+    try:
+        results = {}
+        for name, run in [
+            ('sync_serial', lambda: bench_sync_serial(base_url, dates)),
+            ('sync_pool', lambda: bench_sync_pool(base_url, dates, args.workers)),
+            ('async', lambda: bench_async(base_url, dates, args.concurrency)),
+        ]:
+            elapsed, hits = run()
+            results[name] = {
+                'elapsed_s': round(elapsed, 4),
+                'dates': len(dates),
+                'hits': hits,
+                'dates_per_s': round(len(dates) / elapsed, 2) if elapsed else None,
+            }
+            print(f"{name:12s} {elapsed:8.3f}s  {hits}/{len(dates)} hits  {len(dates) / elapsed:8.2f} dates/s")
+        print(json.dumps(results, indent=2))
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
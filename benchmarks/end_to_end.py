@@ -0,0 +1,161 @@
+"""
+Benchmark: download -> extract -> CSV -> summary/validate on synthetic circulars
+Generates N circulars per scale, serves them through the local stub and times each
+stage in an isolated working directory; results are printed as JSON for tracking
+
+Usage: python -m benchmarks.end_to_end [--dates 10 100 1000] [--latency 0] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime
+import pdfplumber
+import csv_manager_enhanced
+from csv_manager_enhanced import (CsvBatchWriter, ensure_directories, extract_pdf_data, create_csv_filename, sync_price_store,
+                                  sync_price_db, view_csv_summary, validate_csv_structure)
+from downloader import HindalcoPDFDownloader
+from benchmarks.stub_server import start_stub_server
+from benchmarks.synthetic import generate_circulars
+
+def stage_stats(samples, items=None):
+    """Timing summary of per-item samples (seconds); items defaults to the sample count"""
+    total = sum(samples)
+    ordered = sorted(samples)
+    items = len(samples) if items is None else items
+    return {
+        'count': len(samples),
+        'total_s': round(total, 4),
+        'mean_ms': round(total / len(samples) * 1000, 3) if samples else None,
+        'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3) if samples else None,
+        'max_ms': round(ordered[-1] * 1000, 3) if samples else None,
+        'per_s': round(items / total, 2) if total else None,
+    }
+
+def fixed(value, width, digits=2):
+    """value formatted to width, or n/a when a stage had no samples"""
+    return f"{value:{width}.{digits}f}" if value is not None else f"{'n/a':>{width}}"
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+@contextlib.contextmanager
+def workspace(path):
+    """Run in path with the CSV manager's per-run date index cleared"""
+    cwd = os.getcwd()
+    os.chdir(path)
+    csv_manager_enhanced._csv_date_index.clear()
+    try:
+        yield
+    finally:
+        csv_manager_enhanced._csv_date_index.clear()
+        os.chdir(cwd)
+
+def bench_scale(count, latency, workdir):
+    source_dir = os.path.join(workdir, "synthetic")
+    archive_dir = os.path.join(workdir, "Downloads")
+    results = {'dates': count}
+
+    circulars, elapsed = timed(generate_circulars, source_dir, count)
+    results['generate'] = stage_stats([elapsed], items=count)
+
+    server, base_url = start_stub_server(root=source_dir, latency=latency)
+    try:
+        downloader = HindalcoPDFDownloader(base_url=base_url, archive_dir=archive_dir)
+        samples, paths, size = [], [], 0
+        for date, _, _ in circulars:
+            filepath = os.path.join(downloader.create_directory_structure(date), downloader.construct_filename(date))
+            ok, elapsed = timed(downloader.download_pdf, downloader.construct_url(date), filepath)
+            samples.append(elapsed)
+            if ok:
+                paths.append(filepath)
+                size += os.path.getsize(filepath)
+        results['download_pdf'] = stage_stats(samples)
+        results['download_pdf'].update(files=len(paths), bytes=size,
+                                       mb_per_s=round(size / sum(samples) / 1e6, 3) if sum(samples) else None)
+    finally:
+        server.shutdown()
+
+    with workspace(workdir):
+        ensure_directories()
+        samples, products = [], []
+        for path in paths:
+            rows, elapsed = timed(extract_pdf_data, path, use_cache=False)
+            samples.append(elapsed)
+            products.extend(rows)
+        results['extract_pdf_data'] = stage_stats(samples)
+        results['extract_pdf_data']['rows'] = len(products)
+
+        # The write path convert_pdfs and the pipeline use: buffer, one rewrite per CSV, then the stores
+        writer = CsvBatchWriter()
+        started = time.perf_counter()
+        for product in products:
+            writer.add(product, create_csv_filename(product['description']))
+        written, _ = writer.commit()
+        results['csv_commit'] = stage_stats([time.perf_counter() - started], items=len(products))
+        results['csv_commit']['rows'] = len(written)
+        _, store_elapsed = timed(lambda: (sync_price_store(written), sync_price_db(written)))
+        results['store_sync'] = stage_stats([store_elapsed], items=len(written))
+
+        # Cold runs build the summary cache and validation checkpoints; warm runs reuse them
+        for name, command in [('summary', view_csv_summary), ('validate', validate_csv_structure)]:
+            _, cold = timed(command)
+            _, warm = timed(command)
+            results[name] = {'cold_s': round(cold, 4), 'warm_s': round(warm, 4)}
+
+    expected = count * len(circulars[0][2]) if circulars else 0
+    results['complete'] = len(paths) == count and results['extract_pdf_data']['rows'] == expected
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end pipeline benchmark on synthetic circulars')
+    parser.add_argument('--dates', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Circulars generated per run (one run per value, e.g. 10 100 10000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated per-request latency in seconds')
+    parser.add_argument('--output', help='Also write the JSON results to this file')
+    parser.add_argument('--keep', help='Run in this directory and keep its files instead of a temporary one')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    report = {
+        'benchmark': 'end_to_end',
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pdfplumber': pdfplumber.__version__,
+        'latency_s': args.latency,
+        'runs': [],
+    }
+
+    for count in args.dates:
+        with contextlib.ExitStack() as stack:
+            if args.keep:
+                workdir = os.path.abspath(os.path.join(args.keep, str(count)))
+                os.makedirs(workdir, exist_ok=True)
+            else:
+                workdir = stack.enter_context(tempfile.TemporaryDirectory())
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                run = bench_scale(count, args.latency, workdir)
+        report['runs'].append(run)
+
+        print(f"{count:>6} dates  download {fixed(run['download_pdf']['mean_ms'], 7)} ms  "
+              f"extract {fixed(run['extract_pdf_data']['mean_ms'], 7)} ms  "
+              f"csv {fixed(run['csv_commit']['per_s'], 9, 1)} rows/s  "
+              f"summary {run['summary']['cold_s']:.3f}/{run['summary']['warm_s']:.3f}s  "
+              f"validate {run['validate']['cold_s']:.3f}/{run['validate']['warm_s']:.3f}s", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: extract_pdf_data against the previous two-pass page walk
+Parses every PDF under Downloads/ (or the given directory) several times
+
+Usage: python -m benchmarks.extract [--root Downloads] [--repeat 3]
+"""
+
+import os
+import json
+import time
+import argparse
+import contextlib
+import pdfplumber
+from config import ARCHIVE_DIR
+from csv_manager_enhanced import extract_pdf_data, parse_table_rows, parse_text_rows
+
+def two_pass_extract(pdf_path):
+    """The pre-optimisation extractor: text from every page, then tables from every page"""
+    with pdfplumber.open(pdf_path) as pdf:
+        all_text = ""
+        for page in pdf.pages:
+            all_text += (page.extract_text() or "") + "\n"
+        rows = []
+        for page in pdf.pages:
+            table = page.extract_table()
+            if table:
+                rows.extend(parse_table_rows(table))
+        if not rows:
+            rows = parse_text_rows(all_text)
+        return rows
+
+def find_pdfs(root):
+    pdf_paths = []
+    for dirpath, _, filenames in os.walk(root):
+        pdf_paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.pdf'))
+    return sorted(pdf_paths)
+
+def time_extractor(extractor, pdf_paths, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for pdf_path in pdf_paths:
+                extractor(pdf_path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF extraction benchmark')
+    parser.add_argument('--root', default=ARCHIVE_DIR, help='Directory searched recursively for PDFs')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per extractor; the best is reported')
+    args = parser.parse_args()
+
+    pdf_paths = find_pdfs(args.root)
+    if not pdf_paths:
+        print(f"❌ No PDF files found under {args.root}")
+        return
+
+    baseline = time_extractor(two_pass_extract, pdf_paths, args.repeat)
+    current = time_extractor(lambda pdf_path: extract_pdf_data(pdf_path, use_cache=False), pdf_paths, args.repeat)
+    results = {
+        'files': len(pdf_paths),
+        'two_pass_s': round(baseline, 4),
+        'single_pass_s': round(current, 4),
+        'speedup': round(baseline / current, 2) if current else None,
+    }
+    print(f"two-pass     {baseline:8.3f}s  ({baseline / len(pdf_paths) * 1000:.1f} ms/file)")
+    print(f"single-pass  {current:8.3f}s  ({current / len(pdf_paths) * 1000:.1f} ms/file)")
+    print(f"speedup      {results['speedup']}x over {len(pdf_paths)} files")
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
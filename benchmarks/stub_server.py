@@ -0,0 +1,150 @@
+"""
+Local stub of the Hindalco PDF host
+Serves the PDFs archived under Downloads/ at the URLs the downloader builds;
+drop_after cuts each file's first full response short, to exercise resume;
+stall_after pauses full responses midway, to exercise cancellation
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from datetime import datetime
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import ARCHIVE_DIR
+
+URL_PATH_PATTERN = re.compile(r'^/Upload/PDF/primary-ready-reckoner-(\d{1,2})-([a-z]+)-(\d{4})\.pdf$', re.IGNORECASE)
+RANGE_PATTERN = re.compile(r'^bytes=(\d+)-$')
+
+def find_archived_pdf(root, date):
+    """Locate the archived PDF for date under either naming scheme"""
+    dir_path = os.path.join(root, date.strftime("%Y"), date.strftime("%b"))
+    candidates = [
+        f"Hindalco_Circular_{date.strftime('%d_%b_%y')}.pdf",
+        f"primary-ready-reckoner-{date.strftime('%d')}-{date.strftime('%B').lower()}-{date.strftime('%Y')}.pdf",
+    ]
+    for name in candidates:
+        path = os.path.join(dir_path, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops SYNs under concurrent clients
+
+class StubHandler(BaseHTTPRequestHandler):
+    root = ARCHIVE_DIR
+    latency = 0.0
+    cache = {}
+    drop_after = None  # bytes of body sent before the connection drops, once per file
+    dropped = set()
+    stall_after = None  # bytes of body sent before a full response pauses for stall_seconds
+    stall_seconds = 5.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self):
+        match = URL_PATH_PATTERN.match(self.path)
+        if not match:
+            return None
+        day, month, year = match.groups()
+        try:
+            date = datetime.strptime(f"{day} {month} {year}", "%d %B %Y")
+        except ValueError:
+            return None
+        return find_archived_pdf(self.root, date)
+
+    def _load(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key not in self.cache:
+            with open(path, 'rb') as f:
+                body = f.read()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            self.cache[key] = (body, etag, formatdate(stat.st_mtime, usegmt=True))
+        return self.cache[key]
+
+    def _respond(self, send_body):
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = self._resolve()
+        if path is None:
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body, etag, last_modified = self._load(path)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        status = 200
+        range_match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        if range_match and self.headers.get('If-Range', etag) == etag:
+            start = int(range_match.group(1))
+            if start < len(body):
+                status = 206
+                self.send_response(206)
+                self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+                body = body[start:]
+        if status == 200:
+            self.send_response(200)
+
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        if send_body and status == 200 and self.drop_after is not None and path not in self.dropped:
+            self.dropped.add(path)
+            self.wfile.write(body[:self.drop_after])
+            self.close_connection = True
+        elif send_body and status == 200 and self.stall_after is not None:
+            self.wfile.write(body[:self.stall_after])
+            self.wfile.flush()
+            time.sleep(self.stall_seconds)
+            try:
+                self.wfile.write(body[self.stall_after:])
+            except ConnectionError:
+                pass  # the client gave up while the response was stalled
+        elif send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+def start_stub_server(root=ARCHIVE_DIR, latency=0.0, port=0, drop_after=None, stall_after=None):
+    """Start the stub in a daemon thread; returns (server, base_url template for the downloaders)"""
+    handler = type('BoundStubHandler', (StubHandler,), {'root': root, 'latency': latency, 'cache': {},
+                                                        'drop_after': drop_after, 'dropped': set(),
+                                                        'stall_after': stall_after})
+    server = StubServer(('127.0.0.1', port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    base_url = f"http://{host}:{port}/Upload/PDF/primary-ready-reckoner-{{}}-{{}}-{{}}.pdf"
+    return server, base_url
+
+if __name__ == "__main__":
+    import sys
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    server, base_url = start_stub_server(port=port)
+    print(f"Serving {ARCHIVE_DIR}/ as {base_url.format('DD', 'month', 'YYYY')}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,111 @@
+"""
+Synthetic Hindalco rate circulars
+Writes single-page PDFs with the 7-product EXPECTED_PRODUCTS rate table and a w.e.f.
+date, laid out like the published ready reckoner, using only the standard library
+
+Usage: python -m benchmarks.synthetic <root> [--dates 100] [--start 2000-01-01] [--seed 0]
+"""
+
+import os
+import random
+import argparse
+from datetime import datetime, timedelta
+from config import FILE_NAME_TEMPLATE
+from product_catalog import EXPECTED_PRODUCTS
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+TABLE_LEFT, TABLE_SPLIT, TABLE_RIGHT = 40, 440, 555  # column rules: description | price
+TABLE_TOP = 740
+ROW_HEIGHT = 20
+BASE_PRICES = [262000, 248500, 246000, 256250, 271500, 281000, 284000]  # Rs/MT, one per product
+PRICE_STEP = 500  # circular-to-circular moves are whole multiples of this
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+def _text(x, y, size, text, font="F1"):
+    return f"BT /{font} {size} Tf {x} {y} Td {_pdf_string(text)} Tj ET"
+
+def _content_stream(date, prices):
+    ops = [
+        _text(TABLE_LEFT, 790, 14, "HINDALCO INDUSTRIES LIMITED", font="F2"),
+        _text(TABLE_LEFT, 770, 10, f"Primary Ready Reckoner - Aluminium prices w.e.f. {date.strftime('%d.%m.%Y')}"),
+        "0.5 w",
+    ]
+    rows = [("Product", "Price (Rs/MT)")] + [(description, f"{price:,}") for description, price in zip(EXPECTED_PRODUCTS, prices)]
+    bottom = TABLE_TOP - ROW_HEIGHT * len(rows)
+    for i in range(len(rows) + 1):
+        y = TABLE_TOP - ROW_HEIGHT * i
+        ops.append(f"{TABLE_LEFT} {y} m {TABLE_RIGHT} {y} l S")
+    for x in (TABLE_LEFT, TABLE_SPLIT, TABLE_RIGHT):
+        ops.append(f"{x} {TABLE_TOP} m {x} {bottom} l S")
+    for i, (description, price) in enumerate(rows):
+        y = TABLE_TOP - ROW_HEIGHT * (i + 1) + 7
+        font = "F2" if i == 0 else "F1"
+        ops.append(_text(TABLE_LEFT + 4, y, 8, description, font=font))
+        ops.append(_text(TABLE_SPLIT + 4, y, 8, price, font=font))
+    return "\n".join(ops).encode('latin-1')
+
+def build_circular(date, prices):
+    """PDF bytes of one circular: title, w.e.f. date and a ruled description/price table"""
+    stream = _content_stream(date, prices)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+         f"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>").encode('latin-1'),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def circular_path(root, date):
+    """Archive path the downloader (and the stub server) use for date"""
+    filename = FILE_NAME_TEMPLATE.format(day=date.strftime("%d"), month=date.strftime("%b"), year=date.strftime("%y"))
+    return os.path.join(root, date.strftime("%Y"), date.strftime("%b"), filename)
+
+def price_series(count, seed=0):
+    """count rows of prices, one per product, moving in PRICE_STEP increments"""
+    rng = random.Random(seed)
+    prices = list(BASE_PRICES)
+    for _ in range(count):
+        prices = [max(PRICE_STEP, price + PRICE_STEP * rng.randint(-4, 4)) for price in prices]
+        yield prices
+
+def generate_circulars(root, count, start=datetime(2000, 1, 1), seed=0):
+    """Write count circulars for consecutive days under root/<year>/<Mon>/; returns [(date, path, prices)]"""
+    written = []
+    for offset, prices in enumerate(price_series(count, seed)):
+        date = start + timedelta(days=offset)
+        path = circular_path(root, date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(build_circular(date, prices))
+        written.append((date, path, prices))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic Hindalco rate circulars')
+    parser.add_argument('root', help='Archive directory to write <year>/<Mon>/ PDFs into')
+    parser.add_argument('--dates', type=int, default=100, help='Number of consecutive daily circulars')
+    parser.add_argument('--start', default='2000-01-01', help='First date (YYYY-MM-DD)')
+    parser.add_argument('--seed', type=int, default=0, help='Price random-walk seed')
+    args = parser.parse_args()
+
+    written = generate_circulars(args.root, args.dates, datetime.strptime(args.start, '%Y-%m-%d'), args.seed)
+    print(f"✅ Wrote {len(written)} circulars under {args.root} "
+          f"({written[0][0]:%Y-%m-%d} to {written[-1][0]:%Y-%m-%d})" if written else "❌ Nothing written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Date resolution for Hindalco rate circulars
+Reads the circular date from the filename (both naming schemes the downloader has
+used), the Downloads/<year>/<Mon> archive path and the "w.e.f." date in the PDF text
+"""
+
+import os
+import re
+import calendar
+from datetime import date
+from functools import lru_cache
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+# 2025-07-05
+ISO_DATE_PATTERN = re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)')
+# Hindalco_Circular_05_Jul_25.pdf, primary-ready-reckoner-02-july-2025.pdf
+NAMED_MONTH_PATTERN = re.compile(r'(?<![A-Za-z0-9])(\d{1,2})[-_ .]([A-Za-z]{3,9})[-_ .](\d{4}|\d{2})(?!\d)')
+# Downloads/2025/Jul/...
+ARCHIVE_PATH_PATTERN = re.compile(r'(?:^|[\\/])(\d{4})[\\/]([A-Za-z]{3,9})(?=[\\/]|$)')
+# "w.e.f. 05.07.2025" (with effect from)
+EFFECTIVE_DATE_PATTERN = re.compile(r'w\.?\s*e\.?\s*f\.?\s*:?\s*(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})', re.IGNORECASE)
+
+def month_number(name):
+    """1-12 for a month name or abbreviation ("Jul", "july", "Sept"), else None"""
+    name = name.lower()
+    for full_name, number in MONTHS.items():
+        if len(name) >= 3 and full_name.startswith(name if name != 'sept' else 'sep'):
+            return number
+    return None
+
+def make_date(year, month, day):
+    """YYYY-MM-DD for the given parts (two-digit years are 20yy), or None if it is not a real date"""
+    year, month, day = int(year), int(month), int(day)
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def date_from_filename(filename):
+    """Circular date spelled in a PDF filename, or None"""
+    match = ISO_DATE_PATTERN.search(filename)
+    if match:
+        resolved = make_date(*match.groups())
+        if resolved:
+            return resolved
+    for day, month_name, year in NAMED_MONTH_PATTERN.findall(filename):
+        month = month_number(month_name)
+        resolved = month and make_date(year, month, day)
+        if resolved:
+            return resolved
+    return None
+
+@lru_cache(maxsize=1024)
+def archive_month(directory):
+    """(year, month) of a Downloads/<year>/<Mon> directory, or None"""
+    match = ARCHIVE_PATH_PATTERN.search(directory)
+    if not match:
+        return None
+    month = month_number(match.group(2))
+    return (int(match.group(1)), month) if month else None
+
+def effective_date(text):
+    """The w.e.f. date in circular text, or None"""
+    match = EFFECTIVE_DATE_PATTERN.search(text or "")
+    if not match:
+        return None
+    day, month, year = match.groups()
+    return make_date(year, month, day)
+
+def resolve_circular_date(pdf_path, text_date=None):
+    """Circular date for a PDF, or None when nothing identifies it
+
+    The filename date is preferred. When it falls outside the archive month
+    the file sits in, but the text's w.e.f. date does not, the text wins. The
+    text date is used alone when the filename carries no date.
+    """
+    filename_date = date_from_filename(os.path.basename(pdf_path))
+    if not filename_date or filename_date == text_date:
+        return filename_date or text_date
+
+    month = archive_month(os.path.dirname(os.path.abspath(pdf_path)))
+    if text_date and month:
+        prefix = f"{month[0]:04d}-{month[1]:02d}"
+        if not filename_date.startswith(prefix) and text_date.startswith(prefix):
+            return text_date
+    return filename_date
@@ -5,13 +5,39 @@ Configuration file for Hindalco PDF Downloader
 import os
 
 # Base configuration
-BASE_URL = "https://www.hindalco.com/Upload/PDF/primary-ready-reckoner-{}-{}-{}.pdf"
 DOWNLOAD_DIR = "downloads"
+ARCHIVE_DIR = "Downloads"  # PDFs are stored as Downloads/<year>/<Mon>/
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "downloader.log")
+CAPTURE_METRICS_FILE = os.path.join(LOG_DIR, "capture_metrics.jsonl")
+
+# URL templates tried by the resolver, in this order until hit-rate history says otherwise.
+# Fields: {day} zero-padded, {day_nopad}, {month}/{Month} full name lower/capitalised,
+# {mon}/{Mon} abbreviated lower/capitalised, {year} four digits, {yy} two digits
+URL_TEMPLATES = [
+    "https://www.hindalco.com/Upload/PDF/primary-ready-reckoner-{day}-{month}-{year}.pdf",
+    "https://www.hindalco.com/Upload/PDF/primary-ready-reckoner-{day_nopad}-{month}-{year}.pdf",
+    "https://www.hindalco.com/Upload/PDF/primary-ready-reckoner-{day}-{Month}-{year}.pdf",
+    "https://www.hindalco.com/Upload/PDF/primary-ready-reckoner-{day}-{mon}-{year}.pdf",
+    "https://www.hindalco.com/Upload/PDF/Hindalco_Circular_{day}_{Mon}_{yy}.pdf",
+]
+URL_PATTERN_STATS_FILE = "url_patterns.json"  # hit-rate history, stored under ARCHIVE_DIR
+URL_PATTERN_MAX_CANDIDATES = 3  # templates tried for a date in a month without a known winner
+URL_PATTERN_PRUNE_AFTER = 20  # a template with this many tries and no hit is no longer tried
 
 # Schedule configuration
 DOWNLOAD_TIME = "16:00"  # 4 PM in 24-hour format
+SCHEDULER_MODE = "adaptive"  # "adaptive" polls around the learned publish window, "fixed" runs once at DOWNLOAD_TIME
+
+# Adaptive polling configuration (times are local, 24-hour format)
+POLL_WINDOW_START = "11:00"  # default publish window used until enough history is learned
+POLL_WINDOW_END = "18:00"
+POLL_WINDOW_MARGIN_MINUTES = 30  # widen the learned window by this much on both sides
+POLL_LEARN_DAYS = 90  # history considered when learning the publish window
+POLL_MIN_SAMPLES = 5  # captures needed before the learned window replaces the default
+POLL_MAX_INTERVAL_MINUTES = 30  # polling interval at the edges of the window
+POLL_MIN_INTERVAL_MINUTES = 2  # polling interval around the typical publish time
+POLL_GIVE_UP_TIME = "23:00"  # stop polling for the day after this time
 
 # File naming configuration
 FILE_NAME_TEMPLATE = "Hindalco_Circular_{day}_{month}_{year}.pdf"
@@ -20,6 +46,43 @@ FILE_NAME_TEMPLATE = "Hindalco_Circular_{day}_{month}_{year}.pdf"
 REQUEST_TIMEOUT = 30  # seconds
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds between retries
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes per streamed write
+PART_SUFFIX = ".part"  # in-progress downloads are written to <file>.part and renamed when verified
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Async client configuration
+ASYNC_CONCURRENCY = 16  # simultaneous downloads in AsyncHindalcoPDFDownloader.download_range
+RETRY_BACKOFF_BASE = 1.0  # first retry delay in seconds, doubled on every attempt
+RETRY_BACKOFF_MAX = 30.0  # cap on a single retry delay before jitter
+
+# Backfill configuration
+BACKFILL_WORKERS = 8  # concurrent download workers used by --backfill
+RATE_LIMIT_PER_HOST = 4.0  # max requests per second sent to a single host
+
+# Known-missing date index (one JSON file per year under ARCHIVE_DIR/<year>/)
+DATE_INDEX_FILE = "date_index.json"
+MISSING_RECHECK_HOURS = 6  # re-probe a recent 404 date after this many hours
+MISSING_FINAL_AFTER_DAYS = 7  # a 404 seen this many days after the date is never re-probed
+
+# Conditional revalidation of PDFs already on disk
+REVALIDATE_WINDOW_DAYS = 7  # only dates this recent are re-checked against the server copy
+REVALIDATE_AFTER_HOURS = 12  # minimum time between conditional checks of the same file
+
+# Download -> extract -> store pipeline (run.py --pipeline)
+PIPELINE_QUEUE_SIZE = 8  # downloaded PDFs waiting for extraction; downloads block when it is full
+PIPELINE_BATCH_SIZE = 16  # queued PDFs committed to the CSVs and stores together
+
+# Filesystem-watch ingestion (csv_manager_enhanced.py watch)
+WATCH_SETTLE_SECONDS = 2.0  # a new PDF must keep the same size and mtime this long before it is extracted
+WATCH_POLL_SECONDS = 1.0  # pending-file check interval; also the directory poll interval without watchdog
+WATCH_RESCAN_SECONDS = 300  # safety-net directory poll interval while watchdog events are used
+
+# Metrics and tracing (metrics.py); off unless enabled here or with run.py --metrics
+METRICS_ENABLED = False
+METRICS_PROMETHEUS_FILE = os.path.join(LOG_DIR, "metrics.prom")  # rewritten on every export, for node_exporter's textfile collector
+METRICS_JSONL_FILE = os.path.join(LOG_DIR, "metrics.jsonl")  # one snapshot line appended on every export
+METRICS_TRACE_FILE = None  # e.g. os.path.join(LOG_DIR, "trace.jsonl") to write a span per pipeline stage
+METRICS_EXPORT_SECONDS = 60  # export interval while running; metrics are also exported at exit
 
 # Logging configuration
 LOG_LEVEL = "INFO"
@@ -1,175 +1,351 @@
 import os
 import csv
 import pandas as pd
-from datetime import datetime
 import pdfplumber
 import re
+import json
+import time
+import hashlib
 from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import shutil
+import metrics
+import price_store
+import price_db
+import csv_snapshots
+from file_lock import file_lock
+from circular_dates import effective_date, resolve_circular_date
+from csv_tools import (write_csv_atomic, load_json, save_json, csv_summaries, print_csv_summaries, summaries_json,
+                       validate_csv_files, print_validation_results)
+import product_catalog
+from product_catalog import EXPECTED_PRODUCTS, create_csv_filename
 
 CSV_DIR = "csv"
 PDF_DIR = "pdf"
 BACKUP_DIR = "backups"
-
-# Expected 7 line items from your PDF
-EXPECTED_PRODUCTS = [
-    "P0405 (Si 0.04% max, Fe 0.06% max) 99.85% (min)",
-    "P0610 (99.85% min) /P1020/ EC Grade Ingot & Sow 99.7% (min) / Cast Bar",
-    "CG Grade Ingot & Sow 99.5% (min) purity",
-    "EC Grade Wire Rods, Dia 9.5 mm - Conductivity 61% min",
-    "6201 Alloy Wire Rod - Dia 9.5 mm (HAC-1)",
-    "Billets (AA6063) Dia 7\", 8\" & 9\" - subject to availability",
-    "Billets (AA6063) Dia 5\", 6\" - subject to availability"
-]
+ARCHIVE_DIR = "Downloads"  # downloader's Downloads/<year>/<Mon>/ tree, ingested in place
+INGEST_MANIFEST_FILE = os.path.join("cache", "ingest_manifest.json")  # ingested files and scanned directories
+EXTRACTION_CACHE_DIR = os.path.join("cache", "extraction")  # parsed rows keyed by PDF SHA-256
+EXTRACTOR_VERSION = 2  # bump when parsing changes so cached rows are re-derived
+EXTRACT_WORKERS = os.cpu_count() or 1  # processes used to parse PDFs in parallel
+SLOW_PARSE_REPORT = 5  # slowest files listed in the parse-time report
+RATE_TABLE_PAGE = 0  # page index that normally holds the rate table
 
 def ensure_directories():
     """Create necessary directories if they don't exist"""
-    for directory in [CSV_DIR, PDF_DIR, BACKUP_DIR]:
+    for directory in [CSV_DIR, PDF_DIR, BACKUP_DIR, EXTRACTION_CACHE_DIR]:
         os.makedirs(directory, exist_ok=True)
 
-def extract_pdf_data(pdf_path):
-    """Extract data from PDF file"""
+TABLE_PRICE_PATTERN = re.compile(r'(\d+(?:,\d{3})*(?:\.\d{2})?)')
+TEXT_PRICE_PATTERN = re.compile(r'(\d+(?:,\d{3})*)')
+PRODUCT_KEYWORDS = ['grade', 'alloy', 'billet', 'wire', 'ingot']
+
+def parse_table_rows(table):
+    """Product rows from an extracted table: (description, price) pairs"""
+    rows = []
+    for row in table[1:]:  # Skip header
+        if len(row) >= 2 and row[0] and row[1]:
+            # Clean the data
+            description = str(row[0]).strip()
+            price_str = str(row[1]).strip()
+            
+            # Extract price (remove currency symbols, commas)
+            price_match = TABLE_PRICE_PATTERN.search(price_str)
+            if price_match:
+                rows.append((description, int(price_match.group(1).replace(',', ''))))
+    return rows
+
+def parse_text_rows(text):
+    """Product rows from free text: lines with a product keyword and a number"""
+    rows = []
+    for line in text.split('\n'):
+        # Look for lines with product info and prices
+        if any(keyword in line.lower() for keyword in PRODUCT_KEYWORDS):
+            # Extract price from the line
+            price_match = TEXT_PRICE_PATTERN.search(line)
+            if price_match:
+                rows.append((line.strip(), int(price_match.group(1).replace(',', ''))))
+    return rows
+
+def page_visit_order(page_count):
+    """Hinted rate-table page first, then the rest in document order"""
+    hint = RATE_TABLE_PAGE if 0 <= RATE_TABLE_PAGE < page_count else 0
+    return [hint] + [i for i in range(page_count) if i != hint]
+
+def page_effective_date(page):
+    """The w.e.f. date in a page's characters, which extract_table() has already parsed"""
+    return effective_date("".join(char['text'] for char in page.chars))
+
+def parse_pdf_rows(pdf_path):
+    """Parse (description, price) rows and the w.e.f. date out of a PDF
+    
+    Tables are tried first, starting with the page that normally holds the rate
+    table; when it yields the full product list no other page is opened. Text is
+    only extracted, page by page, when no table was found anywhere. The w.e.f.
+    date is read from the characters of the pages already visited.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        rows = []
+        pages_without_table = []
+        text_date = None
+        
+        for index in page_visit_order(len(pdf.pages)):
+            page = pdf.pages[index]
+            table = page.extract_table()
+            text_date = text_date or page_effective_date(page)
+            table_rows = parse_table_rows(table) if table else []
+            if table_rows:
+                rows.extend(table_rows)
+                if index == RATE_TABLE_PAGE and len(table_rows) >= len(EXPECTED_PRODUCTS):
+                    break  # the full rate table was where we expected it
+            else:
+                pages_without_table.append(index)
+        
+        # If no table found, try text extraction on the pages visited so far
+        if not rows:
+            for index in sorted(pages_without_table):
+                rows.extend(parse_text_rows(pdf.pages[index].extract_text() or ""))
+        
+        return rows, text_date
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def load_cached_rows(sha256):
+    """(rows, w.e.f. date) cached for this PDF content by the current extractor version, or None"""
+    cache_path = os.path.join(EXTRACTION_CACHE_DIR, f"{sha256}.json")
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('version') != EXTRACTOR_VERSION:
+        return None
+    return [tuple(row) for row in cached['rows']], cached.get('text_date')
+
+def store_cached_rows(sha256, rows, text_date, source):
+    """Cache parsed rows and the w.e.f. date under the PDF hash (atomic write, safe from worker processes)"""
+    os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(EXTRACTION_CACHE_DIR, f"{sha256}.json")
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': EXTRACTOR_VERSION, 'source': source, 'rows': rows, 'text_date': text_date}, f)
+    os.replace(tmp_path, cache_path)
+
+def extract_pdf_data(pdf_path, use_cache=True):
+    """Extract data from PDF file
+    
+    Parsed rows are cached by file hash and extractor version, so unchanged PDFs
+    are only parsed once. The date comes from the filename, the archive path and
+    the circular's w.e.f. date (see circular_dates); a PDF with no resolvable
+    date yields no rows rather than being stamped with today's date.
+    """
     print(f"🔍 Extracting data from: {pdf_path}")
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            all_text = ""
-            for page in pdf.pages:
-                all_text += page.extract_text() + "\n"
-            
-            # Extract date from filename or content
-            pdf_name = os.path.basename(pdf_path)
-            date_match = re.search(r'(\d{4}-\d{2}-\d{2})', pdf_name)
-            if date_match:
-                extraction_date = date_match.group(1)
-            else:
-                extraction_date = datetime.now().strftime("%Y-%m-%d")
-            
-            # Extract product data
-            products_data = []
-            
-            # Look for table-like structure
-            for page in pdf.pages:
-                table = page.extract_table()
-                if table:
-                    for row in table[1:]:  # Skip header
-                        if len(row) >= 2 and row[0] and row[1]:
-                            # Clean the data
-                            description = str(row[0]).strip()
-                            price_str = str(row[1]).strip()
-                            
-                            # Extract price (remove currency symbols, commas)
-                            price_match = re.search(r'(\d+(?:,\d{3})*(?:\.\d{2})?)', price_str)
-                            if price_match:
-                                price = int(price_match.group(1).replace(',', ''))
-                                products_data.append({
-                                    'date': extraction_date,
-                                    'description': description,
-                                    'price': price
-                                })
-            
-            # If no table found, try text extraction
-            if not products_data:
-                lines = all_text.split('\n')
-                for line in lines:
-                    # Look for lines with product info and prices
-                    if any(keyword in line.lower() for keyword in ['grade', 'alloy', 'billet', 'wire', 'ingot']):
-                        # Extract price from the line
-                        price_match = re.search(r'(\d+(?:,\d{3})*)', line)
-                        if price_match:
-                            price = int(price_match.group(1).replace(',', ''))
-                            products_data.append({
-                                'date': extraction_date,
-                                'description': line.strip(),
-                                'price': price
-                            })
-            
-            return products_data
+        pdf_name = os.path.basename(pdf_path)
+        sha256 = file_sha256(pdf_path) if use_cache else None
+        cached = load_cached_rows(sha256) if use_cache else None
+        if cached is not None:
+            rows, text_date = cached
+            print(f"♻️  Using cached extraction for {pdf_name}")
+        else:
+            rows, text_date = parse_pdf_rows(pdf_path)
+            if use_cache and rows:
+                store_cached_rows(sha256, rows, text_date, pdf_name)
+        
+        extraction_date = resolve_circular_date(pdf_path, text_date)
+        if not extraction_date:
+            print(f"❌ Could not determine the circular date of {pdf_name}; skipped")
+            return []
+        
+        return [{'date': extraction_date, 'description': description, 'price': price}
+                for description, price in rows]
             
     except Exception as e:
         print(f"❌ Error extracting PDF data: {e}")
         return []
 
-def create_csv_filename(description):
-    """Create a safe filename from product description"""
-    # Remove special characters and limit length
-    safe_name = re.sub(r'[^\w\s-]', '', description)
-    safe_name = re.sub(r'\s+', '_', safe_name)
-    safe_name = safe_name[:50]  # Limit length
-    return f"{safe_name}.csv"
+def timed_extract(pdf_path):
+    """Extract one PDF and measure its parse time (runs inside a worker process)"""
+    started = time.perf_counter()
+    products_data = extract_pdf_data(pdf_path)
+    return pdf_path, products_data, time.perf_counter() - started
 
-def save_to_csv(product_data, csv_filename):
-    """Save product data to CSV file"""
-    csv_path = os.path.join(CSV_DIR, csv_filename)
-    
-    # Check if file exists
-    file_exists = os.path.exists(csv_path)
+def extract_pdfs_parallel(pdf_paths, workers=EXTRACT_WORKERS):
+    """Parse PDFs in a process pool, yielding (pdf_path, products_data, seconds) in input order"""
+    workers = max(1, min(workers, len(pdf_paths)))
+    if workers == 1:
+        for pdf_path in pdf_paths:
+            yield timed_extract(pdf_path)
+        return
     
-    # Read existing data if file exists
-    existing_data = []
-    if file_exists:
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(timed_extract, pdf_paths)
+
+def print_parse_times(parse_times):
+    """Report total parse time and the slowest files"""
+    if not parse_times:
+        return
+    total = sum(parse_times.values())
+    print(f"\n⏱️  PARSE TIMES: {len(parse_times)} files, {total:.2f}s total, {total / len(parse_times):.2f}s average")
+    for pdf_file, seconds in sorted(parse_times.items(), key=lambda item: item[1], reverse=True)[:SLOW_PARSE_REPORT]:
+        print(f"   {seconds:6.2f}s  {pdf_file}")
+
+# Per-run index of the dates in each product CSV, keyed by path: {'dates': set, 'stat': (mtime_ns, size)}
+_csv_date_index = {}
+
+def _file_stat(csv_path):
+    stat = os.stat(csv_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_date_index(csv_path):
+    """Dates already in csv_path, read once per run and re-read only if the file changed underneath us"""
+    entry = _csv_date_index.get(csv_path)
+    stat = _file_stat(csv_path) if os.path.exists(csv_path) else None
+    if entry is not None and entry['stat'] == stat:
+        return entry
+    
+    dates = set()
+    if stat is not None:
         try:
             with open(csv_path, 'r', newline='') as f:
-                reader = csv.DictReader(f)
-                existing_data = list(reader)
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for row in reader:
+                    if row:
+                        dates.add(row[0])
         except Exception as e:
             print(f"⚠️  Error reading existing CSV: {e}")
     
-    # Check if this date already exists
-    date_exists = any(row['Date'] == product_data['date'] for row in existing_data)
-    
-    if date_exists:
-        print(f"⚠️  Date {product_data['date']} already exists in {csv_filename}")
-        return False
-    
-    # Add new data
-    new_row = {
-        'Date': product_data['date'],
-        'Description': product_data['description'],
-        'Price': product_data['price']
-    }
-    
-    existing_data.append(new_row)
-    
-    # Sort by date
-    existing_data.sort(key=lambda x: x['Date'])
-    
-    # Write to CSV
+    entry = {'dates': dates, 'stat': stat}
+    _csv_date_index[csv_path] = entry
+    return entry
+
+def sync_price_db(rows):
+    """Upsert written rows into the SQLite price database; the CSVs stay authoritative"""
     try:
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['Date', 'Description', 'Price'])
-            writer.writeheader()
-            writer.writerows(existing_data)
-        
-        print(f"✅ Updated {csv_filename} with new data")
-        return True
-        
+        price_db.sync_prices(rows, CSV_DIR)
     except Exception as e:
-        print(f"❌ Error writing to CSV: {e}")
-        return False
+        print(f"⚠️  Error updating price database: {e}")
 
-def process_pdf_to_csv():
-    """Main function to process PDF files and convert to CSV"""
-    ensure_directories()
+class CsvBatchWriter:
+    """Write-behind buffer for a conversion run
     
-    print("📄 PDF TO CSV CONVERTER")
-    print("=" * 60)
-    
-    # Get all PDF files
-    pdf_files = [f for f in os.listdir(PDF_DIR) if f.endswith('.pdf')]
+    Rows are grouped by product CSV and deduplicated by date in memory; commit()
+    then rewrites each touched CSV exactly once, atomically. The pipeline and the
+    watch daemon may commit at the same time, so each file is re-read and merged
+    under a lock on the CSV directory.
+    """
     
-    if not pdf_files:
-        print("❌ No PDF files found in pdf directory")
-        return
+    def __init__(self):
+        self.rows = {}  # csv_path -> {date: row}
+        self.sources = {}  # csv_path -> sources (PDF paths) of its buffered rows
     
-    print(f"📋 Found {len(pdf_files)} PDF files")
+    def add(self, product_data, csv_filename, source=None, replace=False):
+        """Buffer one product row; returns False if the date is already stored or buffered
+        
+        With replace=True the row overwrites a stored or buffered row for the same
+        date instead, for a circular whose content changed since it was ingested.
+        """
+        csv_path = os.path.join(CSV_DIR, csv_filename)
+        buffered = self.rows.setdefault(csv_path, {})
+        date = product_data['date']
+        
+        if not replace and (date in buffered or date in load_date_index(csv_path)['dates']):
+            print(f"⚠️  Date {date} already exists in {csv_filename}")
+            return False
+        
+        buffered[date] = {
+            'Date': date,
+            'Description': product_data['description'],
+            'Price': product_data['price']
+        }
+        if source is not None:
+            self.sources.setdefault(csv_path, set()).add(source)
+        return True
     
-    for pdf_file in pdf_files:
-        pdf_path = os.path.join(PDF_DIR, pdf_file)
-        print(f"\n🔄 Processing: {pdf_file}")
+    def commit(self):
+        """Merge the buffered rows into their CSVs, one sorted atomic rewrite per file
         
-        # Extract data from PDF
-        products_data = extract_pdf_data(pdf_path)
+        Returns (rows actually written tagged with their product_id, {csv_path: sources}
+        for every CSV that could not be written). Callers must not treat a source
+        listed there as stored.
+        """
+        with file_lock(CSV_DIR):
+            return self._commit()
+    
+    def _commit(self):
+        written = []
+        failed = {}
+        for csv_path, buffered in self.rows.items():
+            if not buffered:
+                continue
+            
+            started = time.perf_counter()
+            index = load_date_index(csv_path)
+            existing_data = []
+            if os.path.exists(csv_path):
+                with open(csv_path, 'r', newline='') as f:
+                    existing_data = list(csv.DictReader(f))
+            by_date = {row['Date']: row for row in existing_data}
+            by_date.update(buffered)  # replacement rows win over the stored ones
+            merged = [by_date[date] for date in sorted(by_date)]
+            
+            try:
+                write_csv_atomic(csv_path, merged)
+            except Exception as e:
+                print(f"❌ Error writing to CSV: {e}")
+                failed[csv_path] = self.sources.get(csv_path, set())
+                continue
+            metrics.record_csv_write('batch', time.perf_counter() - started, len(buffered))
+            
+            print(f"✅ Updated {os.path.basename(csv_path)} with {len(buffered)} new rows")
+            product_id = price_store.product_id_for(csv_path)
+            written.extend(dict(row, product_id=product_id) for row in buffered.values())
+            index['dates'] = set(by_date)  # includes rows other processes committed meanwhile
+            index['stat'] = _file_stat(csv_path)
+        
+        self.rows = {}
+        self.sources = {}
+        return written, failed
+
+def sync_price_store(written):
+    """Keep the columnar store in step with the CSVs"""
+    try:
+        if price_store.store_exists():
+            price_store.upsert_prices(written)
+        else:
+            price_store.rebuild_price_store(CSV_DIR)
+        print(f"🗄️  Price store updated: {price_store.PRICE_STORE_PATH}")
+    except Exception as e:
+        print(f"⚠️  Error updating price store: {e}")
+
+def convert_pdfs(pdf_paths, replace=()):
+    """Parse PDFs in parallel and commit their rows to the CSVs and price stores
+    
+    Rows from the PDFs in replace overwrite stored rows for the same dates.
+    Returns ({pdf_path: products extracted}, {pdf file: parse seconds}). A PDF
+    whose rows could not all be written is left out of the first dict, so
+    callers neither move nor record it and the next run retries it.
+    """
+    # Parse in parallel; this process is the single writer for the CSVs
+    parse_times = {}
+    extracted = {}
+    writer = CsvBatchWriter()
+    
+    for pdf_path, products_data, seconds in extract_pdfs_parallel(pdf_paths):
+        pdf_file = os.path.basename(pdf_path)
+        parse_times[pdf_file] = seconds
+        metrics.record_extraction(seconds, len(products_data))
+        extracted[pdf_path] = len(products_data)
+        print(f"\n🔄 Processing: {pdf_file} (parsed in {seconds:.2f}s)")
         
         if not products_data:
             print(f"❌ No data extracted from {pdf_file}")
@@ -188,76 +364,283 @@ def process_pdf_to_csv():
             if is_new_product:
                 print(f"🆕 New product detected: {product['description']}")
             
-            # Save to CSV
-            save_to_csv(product, csv_filename)
-        
-        # Move processed PDF to backup
+            # Buffer for the single commit at the end of the run
+            writer.add(product, csv_filename, source=pdf_path, replace=pdf_path in replace)
+    
+    # Each product CSV is rewritten once, atomically
+    print(f"\n💾 Writing {sum(len(rows) for rows in writer.rows.values())} new rows")
+    with metrics.span('convert.csv', pdfs=len(extracted)):
+        written, failed = writer.commit()
+    with metrics.span('convert.store', rows=len(written)):
+        sync_price_store(written)
+        sync_price_db(written)
+    
+    for pdf_path in sorted(set().union(*failed.values())):
+        print(f"❌ Rows from {os.path.basename(pdf_path)} were not all written; it will be retried")
+        del extracted[pdf_path]
+    return extracted, parse_times
+
+def process_pdf_to_csv():
+    """Main function to process PDF files and convert to CSV"""
+    ensure_directories()
+    
+    print("📄 PDF TO CSV CONVERTER")
+    print("=" * 60)
+    
+    # Get all PDF files
+    pdf_files = [f for f in os.listdir(PDF_DIR) if f.endswith('.pdf')]
+    
+    if not pdf_files:
+        print("❌ No PDF files found in pdf directory")
+        return
+    
+    print(f"📋 Found {len(pdf_files)} PDF files")
+    
+    pdf_paths = [os.path.join(PDF_DIR, pdf_file) for pdf_file in pdf_files]
+    extracted, parse_times = convert_pdfs(pdf_paths)
+    
+    move_processed_pdfs(extracted)
+    print_parse_times(parse_times)
+
+def move_processed_pdfs(extracted):
+    """Move converted PDFs ({pdf_path: products extracted}) to the backup directory"""
+    # Only move PDFs once their rows are safely on disk
+    for pdf_path, count in extracted.items():
+        if not count:
+            continue
+        pdf_file = os.path.basename(pdf_path)
         backup_pdf_path = os.path.join(BACKUP_DIR, f"processed_{pdf_file}")
         shutil.move(pdf_path, backup_pdf_path)
         print(f"📁 Moved {pdf_file} to backup")
 
-def view_csv_summary():
-    """Display summary of all CSV files"""
+def load_ingest_manifest(manifest_file=INGEST_MANIFEST_FILE):
+    """Ingest manifest; one written by another extractor version is discarded so everything is re-parsed"""
+    manifest = load_json(manifest_file)
+    if manifest.get('extractor_version') != EXTRACTOR_VERSION:
+        manifest = {'extractor_version': EXTRACTOR_VERSION, 'dirs': {}, 'files': {}}
+    return manifest
+
+def scan_archive(root, manifest):
+    """PDFs under root that are new or whose size/mtime changed since the manifest was written
+    
+    A directory whose mtime is unchanged is not listed again: the downloader only
+    adds files by rename, which always bumps the directory mtime. Its known
+    subdirectories are still visited, and its known PDFs are stat()ed so a file
+    rewritten in place is still found. Updates manifest['dirs'] and drops
+    manifest['files'] entries for PDFs that disappeared.
+    
+    Returns (sorted [(path, stat)] of new or changed PDFs, [paths removed]).
+    """
+    dirs, files = manifest['dirs'], manifest['files']
+    known = defaultdict(list)
+    for path in files:
+        known[os.path.dirname(path)].append(path)
+    changed, removed = [], []
+    
+    def is_changed(path, st):
+        entry = files.get(path)
+        return not entry or entry['size'] != st.st_size or entry['mtime_ns'] != st.st_mtime_ns
+    
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            dirs.pop(directory, None)
+            continue
+        
+        entry = dirs.get(directory)
+        if entry and entry['mtime_ns'] == mtime_ns:
+            for path in known[directory]:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    removed.append(path)
+                    continue
+                if is_changed(path, st):
+                    changed.append((path, st))
+            pending.extend(entry['subdirs'])
+            continue
+        
+        subdirs, present = [], set()
+        with os.scandir(directory) as entries:
+            for item in entries:
+                if item.is_dir():
+                    subdirs.append(item.path)
+                elif item.name.endswith('.pdf') and item.is_file():
+                    present.add(item.path)
+                    st = item.stat()
+                    if is_changed(item.path, st):
+                        changed.append((item.path, st))
+        
+        removed.extend(path for path in known[directory] if path not in present)
+        dirs[directory] = {'mtime_ns': mtime_ns, 'subdirs': sorted(subdirs)}
+        pending.extend(subdirs)
+    
+    for path in removed:
+        del files[path]
+    return sorted(changed), sorted(removed)
+
+def ingest_entry(pdf_path, st=None, sha256=None):
+    """Manifest entry for a PDF: size, mtime, content hash and the circular date its cached extraction resolves to"""
+    st = st or os.stat(pdf_path)
+    sha256 = sha256 or file_sha256(pdf_path)
+    cached = load_cached_rows(sha256)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha256,
+            'date': resolve_circular_date(pdf_path, cached[1]) if cached else None}
+
+def update_ingest_manifest(manifest_file=INGEST_MANIFEST_FILE, files=None, removed=(), dirs=None):
+    """Merge file entries, removals and directory entries into the manifest on disk; returns the merged manifest
+    
+    The file is re-read under its lock, so entries recorded meanwhile by another
+    process (the pipeline, a second ingest) are kept.
+    """
+    with file_lock(manifest_file):
+        manifest = load_ingest_manifest(manifest_file)
+        manifest['files'].update(files or {})
+        for path in removed:
+            manifest['files'].pop(path, None)
+        manifest['dirs'].update(dirs or {})
+        save_json(manifest_file, manifest)
+    return manifest
+
+def record_ingested(extracted, manifest_file=INGEST_MANIFEST_FILE):
+    """Add PDFs converted outside ingest_archive ({pdf_path: products extracted}) to the ingest manifest"""
+    update_ingest_manifest(manifest_file, {pdf_path: dict(ingest_entry(pdf_path), rows=count)
+                                           for pdf_path, count in extracted.items()})
+
+def ingest_files(candidates, manifest, manifest_file=INGEST_MANIFEST_FILE, removed=()):
+    """Convert the candidate (pdf_path, stat) pairs not already ingested and record them in the manifest
+    
+    A file whose content and circular date match an ingested one is only
+    re-recorded; a known file whose content changed is re-parsed and its rows
+    replace the stored ones. The manifest is merged into the one on disk and
+    refreshed from it. Returns the parse times of the files actually converted.
+    """
+    files = manifest['files']
+    # A touched or copied file whose circular is already ingested is only re-recorded
+    ingested = {(entry['sha256'], entry.get('date')): entry for entry in files.values()}
+    recorded, to_parse, replace = {}, [], set()
+    for pdf_path, st in candidates:
+        entry = ingest_entry(pdf_path, st)
+        previous = files.get(pdf_path)
+        if previous and previous['sha256'] != entry['sha256']:
+            replace.add(pdf_path)
+            to_parse.append((pdf_path, st))
+        elif entry['date'] and (entry['sha256'], entry['date']) in ingested:
+            recorded[pdf_path] = dict(entry, rows=ingested[entry['sha256'], entry['date']].get('rows', 0))
+        else:
+            to_parse.append((pdf_path, st))
+    
+    parse_times = {}
+    if to_parse:
+        print(f"📋 Found {len(to_parse)} new or changed PDF files")
+        extracted, parse_times = convert_pdfs([pdf_path for pdf_path, _ in to_parse], replace=replace)
+        for pdf_path, st in to_parse:
+            if pdf_path in extracted:
+                recorded[pdf_path] = dict(ingest_entry(pdf_path, st), rows=extracted[pdf_path])
+            elif os.path.dirname(pdf_path) in manifest['dirs']:
+                # Unrecorded, so retried: its directory must be listed again on the next scan
+                manifest['dirs'][os.path.dirname(pdf_path)]['mtime_ns'] = None
+    
+    merged = update_ingest_manifest(manifest_file, recorded, removed, manifest['dirs'])
+    manifest.update(merged)
+    return parse_times
+
+def ingest_archive(root=ARCHIVE_DIR, manifest_file=INGEST_MANIFEST_FILE):
+    """Convert new or changed PDFs in the download archive in place, without copying or moving them"""
+    ensure_directories()
+    
+    print(f"📥 ARCHIVE INGEST: {root}")
+    print("=" * 60)
+    
+    if not os.path.exists(root):
+        print(f"❌ Archive directory not found: {root}")
+        return
+    
+    manifest = load_ingest_manifest(manifest_file)
+    changed, removed = scan_archive(root, manifest)
+    parse_times = ingest_files(changed, manifest, manifest_file, removed)
+    
+    if not parse_times:
+        print(f"✅ Archive up to date ({len(manifest['files'])} files ingested)")
+        return
+    
+    print_parse_times(parse_times)
+
+def view_store_summary():
+    """Display the summary from the columnar store: one scan, aggregated per product"""
+    df = price_store.load_prices(columns=['date', 'product_id', 'price'])
+    if df.empty:
+        print("❌ No records in price store")
+        return
+    
+    grouped = df.groupby('product_id', sort=True)
+    summary = grouped.agg(records=('date', 'size'), first=('date', 'min'), last=('date', 'max'))
+    latest = df.loc[grouped['date'].idxmax(), ['product_id', 'price']].set_index('product_id')['price']
+    
+    for product_id, row in summary.iterrows():
+        print(f"📄 {product_id}.csv")
+        print(f"   Records: {row['records']}")
+        print(f"   Date Range: {row['first']} to {row['last']}")
+        print(f"   Latest Price: {latest[product_id]}")
+        print()
+    
+    print(f"📈 TOTAL RECORDS: {len(df)}")
+
+def view_csv_summary(as_json=False):
+    """Display summary of all CSV files
+    
+    as_json prints the per-file stats as JSON; they are cached by file mtime and
+    size, so polling this is one stat() per unchanged file.
+    """
+    if as_json:
+        print(summaries_json(csv_summaries(CSV_DIR)))
+        return
+    
     print("📊 CSV FILES SUMMARY")
     print("=" * 60)
     
+    if price_store.store_exists():
+        try:
+            view_store_summary()
+            return
+        except Exception as e:
+            print(f"⚠️  Price store unreadable, falling back to CSV files: {e}")
+    
     if not os.path.exists(CSV_DIR):
         print("❌ CSV directory not found")
         return
     
-    total_records = 0
-    csv_files = [f for f in os.listdir(CSV_DIR) if f.endswith('.csv') and not f.startswith('backup_')]
-    
-    if not csv_files:
+    summaries = csv_summaries(CSV_DIR)
+    if not summaries:
         print("❌ No CSV files found")
         return
     
-    for filename in sorted(csv_files):
-        filepath = os.path.join(CSV_DIR, filename)
-        
-        try:
-            with open(filepath, 'r') as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-                
-                if len(rows) <= 1:  # Only header or empty
-                    record_count = 0
-                    date_range = "No data"
-                    latest_price = "N/A"
-                else:
-                    record_count = len(rows) - 1  # Subtract header
-                    dates = [row[0] for row in rows[1:] if len(row) > 0]
-                    prices = [row[2] for row in rows[1:] if len(row) > 2]
-                    
-                    if dates:
-                        date_range = f"{min(dates)} to {max(dates)}"
-                        latest_price = prices[-1] if prices else "N/A"
-                    else:
-                        date_range = "No valid dates"
-                        latest_price = "N/A"
-                
-                total_records += record_count
-                print(f"📄 {filename}")
-                print(f"   Records: {record_count}")
-                print(f"   Date Range: {date_range}")
-                print(f"   Latest Price: {latest_price}")
-                print()
-                
-        except Exception as e:
-            print(f"❌ Error reading {filename}: {e}")
+    print_csv_summaries(summaries)
+
+def load_details_frame(filename):
+    """Rows for one product: from the columnar store when it has them, else from the CSV"""
+    if price_store.store_exists():
+        df = price_store.load_prices(product_id=price_store.product_id_for(filename),
+                                     columns=['date', 'description', 'price'])
+        if not df.empty:
+            return df.rename(columns={'date': 'Date', 'description': 'Description', 'price': 'Price'})
     
-    print(f"📈 TOTAL RECORDS: {total_records}")
+    filepath = os.path.join(CSV_DIR, filename)
+    if not os.path.exists(filepath):
+        return None
+    return pd.read_csv(filepath)
 
 def view_csv_details(filename):
     """Display detailed content of a specific CSV file"""
-    filepath = os.path.join(CSV_DIR, filename)
-    
-    if not os.path.exists(filepath):
-        print(f"❌ File not found: {filename}")
-        return
-    
     try:
-        df = pd.read_csv(filepath)
+        df = load_details_frame(filename)
+        if df is None:
+            print(f"❌ File not found: {filename}")
+            return
+        
         print(f"📄 DETAILS FOR: {filename}")
         print("=" * 60)
         print(f"Total Records: {len(df)}")
@@ -275,89 +658,64 @@ def view_csv_details(filename):
     except Exception as e:
         print(f"❌ Error reading {filename}: {e}")
 
-def backup_csv_files():
-    """Create backup of all CSV files"""
-    if not os.path.exists(CSV_DIR):
-        print("❌ CSV directory not found")
-        return
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_dir = os.path.join(BACKUP_DIR, f"csv_backup_{timestamp}")
-    os.makedirs(backup_dir, exist_ok=True)
+def query_price_history(product=None, start=None, end=None):
+    """Print prices from the SQLite database for a product match and inclusive date range"""
+    if not price_db.db_exists():
+        print("🔄 Building price database from CSV files...")
+        price_db.rebuild_price_db(CSV_DIR)
     
-    csv_files = [f for f in os.listdir(CSV_DIR) if f.endswith('.csv')]
+    started = time.perf_counter()
+    rows = price_db.query_prices(product, start, end)
+    elapsed = time.perf_counter() - started
     
-    if not csv_files:
-        print("❌ No CSV files to backup")
+    print(f"🔎 PRICE QUERY: {product or 'all products'} ({start or '...'} to {end or '...'})")
+    print("=" * 60)
+    if not rows:
+        print("❌ No matching records")
         return
     
-    for filename in csv_files:
-        src = os.path.join(CSV_DIR, filename)
-        dst = os.path.join(backup_dir, filename)
-        shutil.copy2(src, dst)
-    
-    print(f"✅ Backed up {len(csv_files)} CSV files to: {backup_dir}")
+    for product_id, date, description, price in rows:
+        print(f"{date}  {price:>10}  {product_id}")
+    print(f"\n📈 {len(rows)} records in {elapsed * 1000:.1f} ms")
+
+def backup_csv_files():
+    """Snapshot all CSV files; unchanged files are stored once across snapshots"""
+    csv_snapshots.backup_csv_files(CSV_DIR)
+
+def restore_csv_files(name=None):
+    """Restore the CSV files from a snapshot (default: the newest) and rebuild the stores from them"""
+    try:
+        name, count = csv_snapshots.restore_snapshot(name, CSV_DIR)
+    except (OSError, ValueError) as e:
+        print(f"❌ Restore failed: {e}")
+        return
+    print(f"✅ Restored {count} CSV files from snapshot {name}")
+    rebuild_price_stores()
+
+def rebuild_price_stores():
+    """Rebuild the Parquet store and SQLite database after CSV files were replaced wholesale"""
+    _csv_date_index.clear()
+    price_store.rebuild_price_stores(CSV_DIR)
 
-def validate_csv_structure():
-    """Validate that all CSV files have the correct structure"""
+def merge_duplicate_csvs(dry_run=False):
+    """Find CSV files holding the same product and merge them into the catalog product's file"""
+    plan = product_catalog.merge_duplicate_csvs(CSV_DIR, dry_run=dry_run)
+    if plan and not dry_run:
+        rebuild_price_stores()
+
+def validate_csv_structure(full=False):
+    """Validate every row of every CSV file
+    
+    Files are checked in parallel, and rows already validated on an earlier clean
+    pass are skipped unless full=True.
+    """
     print("🔍 Validating CSV file structure...")
     
     if not os.path.exists(CSV_DIR):
         print("❌ CSV directory not found")
         return
     
-    expected_columns = ["Date", "Description", "Price"]
-    issues_found = False
-    
-    csv_files = [f for f in os.listdir(CSV_DIR) if f.endswith('.csv')]
-    
-    for filename in csv_files:
-        filepath = os.path.join(CSV_DIR, filename)
-        
-        try:
-            with open(filepath, 'r') as f:
-                reader = csv.reader(f)
-                header = next(reader, None)
-                
-                if header != expected_columns:
-                    print(f"❌ {filename}: Invalid header - {header}")
-                    issues_found = True
-                else:
-                    # Check a few data rows
-                    row_count = 0
-                    for row in reader:
-                        row_count += 1
-                        if len(row) != 3:
-                            print(f"❌ {filename}: Row {row_count + 1} has {len(row)} columns instead of 3")
-                            issues_found = True
-                            continue
-                        
-                        # Validate date format
-                        try:
-                            datetime.strptime(row[0], "%Y-%m-%d")
-                        except ValueError:
-                            print(f"❌ {filename}: Invalid date format in row {row_count + 1}: {row[0]}")
-                            issues_found = True
-                        
-                        # Validate price is numeric
-                        try:
-                            int(row[2])
-                        except ValueError:
-                            print(f"❌ {filename}: Invalid price in row {row_count + 1}: {row[2]}")
-                            issues_found = True
-                        
-                        if row_count > 10:  # Only check first 10 rows
-                            break
-                    
-                    if row_count == 0:
-                        print(f"⚠️  {filename}: No data rows found")
-                
-        except Exception as e:
-            print(f"❌ Error validating {filename}: {e}")
-            issues_found = True
-    
-    if not issues_found:
-        print("✅ All CSV files have valid structure")
+    print_validation_results(validate_csv_files(CSV_DIR, full=full))
 
 def create_workflow():
     """Create a one-time workflow for PDF processing"""
@@ -399,32 +757,63 @@ if __name__ == "__main__":
         elif command == "convert":
             process_pdf_to_csv()
         elif command == "summary":
-            view_csv_summary()
+            view_csv_summary(as_json="--json" in sys.argv[2:])
         elif command == "details" and len(sys.argv) > 2:
             view_csv_details(sys.argv[2])
         elif command == "backup":
             backup_csv_files()
+        elif command == "snapshots":
+            csv_snapshots.print_snapshots()
+        elif command == "restore":
+            restore_csv_files(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif command == "merge":
+            merge_duplicate_csvs(dry_run="--dry-run" in sys.argv[2:])
+        elif command == "ingest":
+            ingest_archive(sys.argv[2] if len(sys.argv) > 2 else ARCHIVE_DIR)
+        elif command == "watch":
+            from ingest_daemon import watch
+            watch()
         elif command == "validate":
-            validate_csv_structure()
+            validate_csv_structure(full="--full" in sys.argv[2:])
+        elif command == "store":
+            count = price_store.rebuild_price_store(CSV_DIR)
+            print(f"✅ Price store rebuilt with {count} rows: {price_store.PRICE_STORE_PATH}")
+        elif command == "query" and len(sys.argv) > 2:
+            product = None if sys.argv[2] == "all" else sys.argv[2]
+            query_price_history(product, *sys.argv[3:5])
         else:
             print("❌ Unknown command or missing filename")
             print("Usage:")
             print("  python csv_manager.py workflow   - Run complete workflow")
             print("  python csv_manager.py convert    - Convert PDF to CSV")
-            print("  python csv_manager.py summary    - Show summary of all CSV files")
+            print("  python csv_manager.py ingest [dir] - Convert new PDFs in the Downloads archive in place")
+            print("  python csv_manager.py watch      - Extract new PDFs from Downloads and pdf as soon as they are complete")
+            print("  python csv_manager.py summary [--json] - Show summary of all CSV files")
             print("  python csv_manager.py details <filename> - Show details of a specific CSV file")
-            print("  python csv_manager.py backup     - Create backup of all CSV files")
-            print("  python csv_manager.py validate   - Validate CSV file structure")
+            print("  python csv_manager.py backup     - Snapshot all CSV files")
+            print("  python csv_manager.py snapshots  - List CSV snapshots")
+            print("  python csv_manager.py restore [snapshot] - Restore CSV files from a snapshot")
+            print("  python csv_manager.py validate [--full] - Validate CSV file structure")
+            print("  python csv_manager.py merge [--dry-run] - Merge duplicate product CSV files")
+            print("  python csv_manager.py store      - Rebuild the columnar price store from CSV files")
+            print("  python csv_manager.py query <product|all> [start] [end] - Query prices by product and date range")
     else:
         print("🛠️  ENHANCED CSV MANAGER")
         print("=" * 40)
         print("Available commands:")
         print("  workflow - Run complete PDF to CSV workflow")
         print("  convert  - Convert PDF files to CSV")
-        print("  summary  - Show summary of all CSV files")
+        print("  ingest   - Convert new PDFs in the Downloads archive in place")
+        print("  watch    - Watch Downloads and pdf, extracting each new PDF once complete")
+        print("  summary  - Show summary of all CSV files (--json for machine-readable output)")
         print("  details  - Show details of a specific CSV file")
-        print("  backup   - Create backup of all CSV files")
-        print("  validate - Validate CSV file structure")
+        print("  backup   - Snapshot all CSV files")
+        print("  snapshots - List CSV snapshots")
+        print("  restore  - Restore CSV files from a snapshot (default: newest)")
+        print("  validate - Validate CSV file structure (--full ignores checkpoints)")
+        print("  merge    - Merge duplicate product CSV files (--dry-run only reports)")
+        print("  store    - Rebuild the columnar price store from CSV files")
+        print("  query    - Query prices by product and date range (YYYY-MM-DD)")
         print("\nQuick Start:")
         print("  1. Place PDF files in 'pdf' folder")
         print("  2. Run: python csv_manager.py workflow")
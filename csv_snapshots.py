@@ -0,0 +1,181 @@
+"""
+Content-addressed snapshot backups for the per-product CSVs
+Each file version is stored once under backups/csv_snapshots/objects/<sha256>;
+a snapshot is a small JSON manifest mapping filenames to object hashes
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime
+from csv_tools import CSV_DIR, list_csv_files
+
+SNAPSHOT_DIR = os.path.join("backups", "csv_snapshots")
+SNAPSHOT_KEEP_RECENT = 5  # most recent snapshots, whatever their age
+SNAPSHOT_KEEP_DAILY = 7  # newest snapshot of each of the last N days with one
+SNAPSHOT_KEEP_WEEKLY = 8  # newest snapshot of each of the last N ISO weeks with one
+COPY_CHUNK_SIZE = 1024 * 1024
+
+def _objects_dir(root):
+    return os.path.join(root, "objects")
+
+def _manifests_dir(root):
+    return os.path.join(root, "manifests")
+
+def object_path(sha256, root=SNAPSHOT_DIR):
+    return os.path.join(_objects_dir(root), sha256[:2], sha256)
+
+def list_snapshots(root=SNAPSHOT_DIR):
+    """Snapshot names, oldest first; names are their creation timestamps"""
+    manifests = _manifests_dir(root)
+    if not os.path.exists(manifests):
+        return []
+    return sorted(f[:-5] for f in os.listdir(manifests) if f.endswith('.json'))
+
+def load_snapshot(name, root=SNAPSHOT_DIR):
+    with open(os.path.join(_manifests_dir(root), f"{name}.json"), 'r') as f:
+        return json.load(f)
+
+def _store_object(path, root):
+    """Copy path into the object store while hashing it; returns (sha256, stored)"""
+    tmp_path = os.path.join(_objects_dir(root), f".incoming-{os.getpid()}")
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f_src, open(tmp_path, 'wb') as f_dst:
+        for chunk in iter(lambda: f_src.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            f_dst.write(chunk)
+    sha256 = digest.hexdigest()
+
+    target = object_path(sha256, root)
+    if os.path.exists(target):
+        os.remove(tmp_path)
+        return sha256, False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(tmp_path, target)
+    return sha256, True
+
+def create_snapshot(csv_dir=CSV_DIR, root=SNAPSHOT_DIR):
+    """Snapshot every product CSV; returns (name, manifest, objects_written)
+
+    A file whose size and mtime match the previous snapshot reuses its hash
+    without being read, so cost scales with what changed since then.
+    """
+    previous = {}
+    snapshots = list_snapshots(root)
+    if snapshots:
+        previous = load_snapshot(snapshots[-1], root)['files']
+
+    files = {}
+    written = 0
+    for filename in list_csv_files(csv_dir):
+        path = os.path.join(csv_dir, filename)
+        st = os.stat(path)
+        entry = previous.get(filename)
+        if (entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+                and os.path.exists(object_path(entry['sha256'], root))):
+            files[filename] = entry
+            continue
+        sha256, stored = _store_object(path, root)
+        written += stored
+        files[filename] = {'sha256': sha256, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    name = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    manifest = {'created': datetime.now().isoformat(timespec='seconds'), 'files': files}
+    os.makedirs(_manifests_dir(root), exist_ok=True)
+    manifest_path = os.path.join(_manifests_dir(root), f"{name}.json")
+    with open(f"{manifest_path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return name, manifest, written
+
+def _snapshot_time(name):
+    return datetime.strptime(name, "%Y%m%d_%H%M%S_%f")
+
+def snapshots_to_keep(names, keep_recent=SNAPSHOT_KEEP_RECENT, keep_daily=SNAPSHOT_KEEP_DAILY,
+                      keep_weekly=SNAPSHOT_KEEP_WEEKLY):
+    """The newest snapshots, plus the newest per day and per ISO week within the limits"""
+    keep = set(names[-max(keep_recent, 1):])
+    daily, weekly = {}, {}
+    for name in reversed(names):
+        created = _snapshot_time(name)
+        daily.setdefault(created.date(), name)
+        weekly.setdefault(created.isocalendar()[:2], name)
+    keep.update(daily[day] for day in sorted(daily, reverse=True)[:keep_daily])
+    keep.update(weekly[week] for week in sorted(weekly, reverse=True)[:keep_weekly])
+    return keep
+
+def prune_snapshots(root=SNAPSHOT_DIR, keep_recent=SNAPSHOT_KEEP_RECENT, keep_daily=SNAPSHOT_KEEP_DAILY,
+                    keep_weekly=SNAPSHOT_KEEP_WEEKLY):
+    """Apply the retention policy, then delete objects no remaining snapshot references
+
+    Returns (snapshots_removed, objects_removed).
+    """
+    names = list_snapshots(root)
+    keep = snapshots_to_keep(names, keep_recent, keep_daily, keep_weekly)
+    removed = [name for name in names if name not in keep]
+    for name in removed:
+        os.remove(os.path.join(_manifests_dir(root), f"{name}.json"))
+
+    referenced = set()
+    for name in keep:
+        referenced.update(entry['sha256'] for entry in load_snapshot(name, root)['files'].values())
+
+    objects_removed = 0
+    objects = _objects_dir(root)
+    for dirpath, _, filenames in os.walk(objects) if os.path.exists(objects) else []:
+        for filename in filenames:
+            if filename not in referenced:
+                os.remove(os.path.join(dirpath, filename))
+                objects_removed += 1
+    return len(removed), objects_removed
+
+def restore_snapshot(name=None, csv_dir=CSV_DIR, root=SNAPSHOT_DIR):
+    """Restore the CSVs recorded in a snapshot (default: the newest); returns (name, files restored)
+
+    The current CSVs are snapshotted first, so a restore can itself be undone.
+    Files are replaced atomically; product CSVs absent from the snapshot are left alone.
+    """
+    snapshots = list_snapshots(root)
+    if name is None:
+        if not snapshots:
+            raise FileNotFoundError(f"No snapshots in {root}")
+        name = snapshots[-1]
+    manifest = load_snapshot(name, root)
+    if list_csv_files(csv_dir):
+        create_snapshot(csv_dir, root)
+
+    os.makedirs(csv_dir, exist_ok=True)
+    for filename, entry in manifest['files'].items():
+        target = os.path.join(csv_dir, filename)
+        tmp_path = f"{target}.tmp"
+        shutil.copyfile(object_path(entry['sha256'], root), tmp_path)
+        os.replace(tmp_path, target)
+    return name, len(manifest['files'])
+
+def backup_csv_files(csv_dir=CSV_DIR, root=SNAPSHOT_DIR):
+    """Snapshot the CSVs and apply the retention policy, printing a one-line report"""
+    if not os.path.exists(csv_dir):
+        print("❌ CSV directory not found")
+        return None
+
+    if not list_csv_files(csv_dir):
+        print("❌ No CSV files to backup")
+        return None
+
+    name, manifest, written = create_snapshot(csv_dir, root)
+    pruned, objects_removed = prune_snapshots(root)
+    print(f"✅ Snapshot {name}: {len(manifest['files'])} CSV files, {written} new objects in {root}")
+    if pruned:
+        print(f"🧹 Pruned {pruned} old snapshots and {objects_removed} unreferenced objects")
+    return name
+
+def print_snapshots(root=SNAPSHOT_DIR):
+    names = list_snapshots(root)
+    if not names:
+        print("❌ No snapshots found")
+        return
+    for name in names:
+        manifest = load_snapshot(name, root)
+        print(f"📦 {name}  {len(manifest['files'])} files  ({manifest['created']})")
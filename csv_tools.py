@@ -0,0 +1,270 @@
+"""
+Shared helpers for the per-product CSV files
+Used by both csv_from_pdf.py and csv_manager_enhanced.py
+"""
+
+import os
+import io
+import re
+import csv
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+CSV_DIR = "csv"
+SUMMARY_CACHE_FILE = os.path.join("cache", "csv_summary.json")  # per-file stats keyed by mtime and size
+VALIDATION_CHECKPOINT_FILE = os.path.join("cache", "csv_validation.json")  # validated prefix per file
+VALIDATE_WORKERS = os.cpu_count() or 1  # processes used to validate files in parallel
+HASH_CHUNK_SIZE = 1024 * 1024
+
+CSV_FIELDNAMES = ["Date", "Description", "Price"]
+DATE_PATTERN = re.compile(r'\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])')
+PRICE_PATTERN = re.compile(r'\d+')
+
+def list_csv_files(csv_dir=CSV_DIR):
+    """Product CSV filenames in csv_dir, sorted; backups are skipped"""
+    if not os.path.exists(csv_dir):
+        return []
+    return sorted(f for f in os.listdir(csv_dir) if f.endswith('.csv') and not f.startswith('backup_'))
+
+def write_csv_atomic(csv_path, rows):
+    """Write rows to a temp file and rename it over csv_path, so readers never see half a file"""
+    tmp_path = f"{csv_path}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, csv_path)
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def summarize_csv(path):
+    """Record count, date range and latest price of one CSV in a single streaming pass"""
+    records = 0
+    first_date = last_date = latest_price = None
+    with open(path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            records += 1
+            if not row:
+                continue
+            date = row[0]
+            if first_date is None or date < first_date:
+                first_date = date
+            if last_date is None or date > last_date:
+                last_date = date
+            if len(row) > 2:
+                latest_price = row[2]
+    return {'records': records, 'first_date': first_date, 'last_date': last_date, 'latest_price': latest_price}
+
+def load_json(path):
+    """Parsed JSON from path, or {} if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_json(path, data):
+    """Write data as JSON via a temp file and rename"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def csv_summaries(csv_dir=CSV_DIR, cache_file=SUMMARY_CACHE_FILE):
+    """Per-file summaries for every product CSV
+
+    Files whose mtime and size match the cached entry are not reopened, so a
+    repeat call costs one stat() per file. Unreadable files get an 'error' key.
+    """
+    cache = load_json(cache_file) if cache_file else {}
+    summaries = []
+    seen = set()
+    changed = False
+
+    for filename in list_csv_files(csv_dir):
+        path = os.path.join(csv_dir, filename)
+        cache_key = os.path.abspath(path)
+        seen.add(cache_key)
+        try:
+            stat_key = _stat_key(path)
+            entry = cache.get(cache_key)
+            if entry is None or entry.get('stat') != stat_key:
+                entry = {'stat': stat_key, 'summary': summarize_csv(path)}
+                cache[cache_key] = entry
+                changed = True
+            summaries.append(dict(file=filename, **entry['summary']))
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            summaries.append({'file': filename, 'error': str(e)})
+
+    # Forget files removed from this directory
+    prefix = os.path.join(os.path.abspath(csv_dir), '')
+    for cache_key in [k for k in cache if k.startswith(prefix) and k not in seen]:
+        del cache[cache_key]
+        changed = True
+
+    if cache_file and changed:
+        try:
+            save_json(cache_file, cache)
+        except OSError:
+            pass
+    return summaries
+
+def print_csv_summaries(summaries, show_latest=True):
+    """Print summaries in the CSV managers' summary layout"""
+    total_records = 0
+    for summary in summaries:
+        if 'error' in summary:
+            print(f"❌ Error reading {summary['file']}: {summary['error']}")
+            continue
+
+        if summary['records'] == 0:
+            date_range = "No data"
+        elif summary['first_date'] is None:
+            date_range = "No valid dates"
+        else:
+            date_range = f"{summary['first_date']} to {summary['last_date']}"
+
+        total_records += summary['records']
+        print(f"📄 {summary['file']}")
+        print(f"   Records: {summary['records']}")
+        print(f"   Date Range: {date_range}")
+        if show_latest:
+            print(f"   Latest Price: {summary['latest_price'] or 'N/A'}")
+        print()
+
+    print(f"📈 TOTAL RECORDS: {total_records}")
+
+def summaries_json(summaries):
+    """Machine-readable summary for monitoring"""
+    return json.dumps({
+        'files': summaries,
+        'total_records': sum(s.get('records', 0) for s in summaries),
+    }, indent=2)
+
+def _prefix_sha256(f, length):
+    """Running SHA-256 of the first length bytes of f"""
+    digest = hashlib.sha256()
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(HASH_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest
+
+def validate_csv(path, checkpoint=None):
+    """Check every row of one CSV: column count, date and price format, strictly increasing dates
+
+    With a checkpoint from an earlier clean pass whose prefix hash still matches,
+    only the bytes appended since are parsed. Returns (issues, rows, checkpoint);
+    checkpoint is None when issues were found, so they are reported again next time.
+    """
+    issues = []
+    with open(path, 'rb') as f:
+        offset, rows, last_date = 0, 0, None
+        digest = hashlib.sha256()
+        if checkpoint and os.fstat(f.fileno()).st_size >= checkpoint['offset']:
+            prefix = _prefix_sha256(f, checkpoint['offset'])
+            if prefix.hexdigest() == checkpoint['sha256']:
+                offset, rows, last_date = checkpoint['offset'], checkpoint['rows'], checkpoint['last_date']
+                digest = prefix
+            else:
+                f.seek(0)
+        tail = f.read()
+
+    # Only complete lines are checked; a line still being written is picked up next time
+    complete = tail.rfind(b'\n') + 1
+    reader = csv.reader(io.StringIO(tail[:complete].decode('utf-8'), newline=''))
+
+    if offset == 0:
+        header = next(reader, None)
+        if header != CSV_FIELDNAMES:
+            return [f"Invalid header - {header}"], 0, None
+
+    for row in reader:
+        rows += 1
+        line = rows + 1
+        if len(row) != 3:
+            issues.append(f"Row {line} has {len(row)} columns instead of 3")
+            continue
+        date, _, price = row
+        if not DATE_PATTERN.fullmatch(date):
+            issues.append(f"Invalid date format in row {line}: {date}")
+        elif last_date is not None and date <= last_date:
+            kind = "Duplicate date" if date == last_date else "Date out of order"
+            issues.append(f"{kind} in row {line}: {date} after {last_date}")
+        else:
+            last_date = date
+        if not PRICE_PATTERN.fullmatch(price):
+            issues.append(f"Invalid price in row {line}: {price}")
+
+    if issues:
+        return issues, rows, None
+
+    digest.update(tail[:complete])
+    return issues, rows, {'offset': offset + complete, 'sha256': digest.hexdigest(), 'rows': rows, 'last_date': last_date}
+
+def _validate_job(job):
+    filename, path, checkpoint = job
+    try:
+        issues, rows, checkpoint = validate_csv(path, checkpoint)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        issues, rows, checkpoint = [f"Error validating: {e}"], 0, None
+    return filename, issues, rows, checkpoint
+
+def validate_csv_files(csv_dir=CSV_DIR, checkpoint_file=VALIDATION_CHECKPOINT_FILE, workers=VALIDATE_WORKERS, full=False):
+    """Validate every product CSV, in parallel, resuming from per-file checkpoints
+
+    Returns [(filename, issues, rows)] sorted by filename. full=True ignores the
+    checkpoints and re-reads every file from the start.
+    """
+    checkpoints = load_json(checkpoint_file) if checkpoint_file else {}
+    jobs = []
+    for filename in list_csv_files(csv_dir):
+        path = os.path.join(csv_dir, filename)
+        jobs.append((filename, path, None if full else checkpoints.get(os.path.abspath(path))))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            outcomes = list(pool.map(_validate_job, jobs))
+    else:
+        outcomes = [_validate_job(job) for job in jobs]
+
+    results = []
+    for (filename, path, _), (_, issues, rows, checkpoint) in zip(jobs, outcomes):
+        cache_key = os.path.abspath(path)
+        if checkpoint:
+            checkpoints[cache_key] = checkpoint
+        else:
+            checkpoints.pop(cache_key, None)
+        results.append((filename, issues, rows))
+
+    if checkpoint_file:
+        try:
+            save_json(checkpoint_file, checkpoints)
+        except OSError:
+            pass
+    return results
+
+def print_validation_results(results):
+    """Print validation results in the CSV managers' layout; returns True if any issue was found"""
+    issues_found = False
+    for filename, issues, rows in results:
+        for issue in issues:
+            print(f"❌ {filename}: {issue}")
+        issues_found = issues_found or bool(issues)
+        if not issues and rows == 0:
+            print(f"⚠️  {filename}: No data rows found")
+
+    if not issues_found:
+        print("✅ All CSV files have valid structure")
+    return issues_found
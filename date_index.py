@@ -0,0 +1,115 @@
+"""
+Persistent per-date outcome index for Hindalco PDF Downloader
+Remembers which dates returned 404 so repeat backfills skip them
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from config import ARCHIVE_DIR, DATE_INDEX_FILE, MISSING_RECHECK_HOURS, MISSING_FINAL_AFTER_DAYS
+from file_lock import file_lock
+
+OUTCOME_DOWNLOADED = "downloaded"
+OUTCOME_MISSING = "missing"
+OUTCOME_ERROR = "error"
+
+class DateIndex:
+    """One compact JSON file per year (Downloads/<year>/date_index.json) keyed by YYYY-MM-DD
+
+    Several processes may share the index (the scheduler, a backfill, the async
+    client), so reads pick up a year file that changed on disk and record()
+    re-reads and merges under a file lock instead of writing back its own copy.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.cache = {}  # year -> (file mtime_ns, entries)
+
+    def _path(self, year):
+        return os.path.join(self.root, year, DATE_INDEX_FILE)
+
+    def _load_year(self, year, fresh=False):
+        """Entries for year, re-read when the file changed since it was cached (always when fresh)"""
+        path = self._path(year)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        cached = self.cache.get(year)
+        if cached and cached[0] == mtime_ns and not fresh:
+            return cached[1]
+
+        entries = {}
+        if mtime_ns is not None:
+            try:
+                with open(path, 'r') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        self.cache[year] = (mtime_ns, entries)
+        return entries
+
+    def _save_year(self, year, entries):
+        path = self._path(year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        self.cache[year] = (os.stat(path).st_mtime_ns, entries)
+
+    def get(self, date):
+        key = date.strftime("%Y-%m-%d")
+        with self.lock:
+            entry = self._load_year(key[:4]).get(key)
+            return dict(entry) if entry else None
+
+    def record(self, date, outcome, status=None, url=None, etag=None, last_modified=None, **extra):
+        """Store the outcome of a probe for date and persist the year file"""
+        key = date.strftime("%Y-%m-%d")
+        fields = {
+            'outcome': outcome,
+            'status': status,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'checked_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        fields.update(extra)
+        with self.lock, file_lock(self._path(key[:4])):
+            entries = self._load_year(key[:4], fresh=True)
+            # Merge so one-off facts such as captured_at survive later revalidations
+            entry = dict(entries.get(key) or {})
+            entry.update(fields)
+            entries[key] = entry
+            self._save_year(key[:4], entries)
+        return dict(entry)
+
+    def years(self):
+        """Years that have an index file on disk"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if name.isdigit() and os.path.exists(self._path(name)))
+
+    def entries(self, year):
+        with self.lock:
+            return {key: dict(entry) for key, entry in self._load_year(year).items()}
+
+    def should_probe(self, date, now=None):
+        """Return False when a 404 for this date is still considered fresh"""
+        entry = self.get(date)
+        if not entry or entry.get('outcome') != OUTCOME_MISSING:
+            return True
+
+        now = now or datetime.now()
+        checked_at = datetime.fromisoformat(entry['checked_at'])
+        day = datetime(date.year, date.month, date.day)
+
+        # A 404 seen well after the date has passed will not change: never re-probe it
+        if checked_at - day >= timedelta(days=MISSING_FINAL_AFTER_DAYS):
+            return False
+
+        return now - checked_at >= timedelta(hours=MISSING_RECHECK_HOURS)
@@ -1,9 +1,17 @@
 import os
 import requests
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import time
+import random
+import hashlib
+from requests.adapters import HTTPAdapter
 from config import *
+import metrics
+from date_index import DateIndex, OUTCOME_DOWNLOADED, OUTCOME_MISSING, OUTCOME_ERROR
+from url_resolver import UrlResolver
 
 # Setup logging
 logging.basicConfig(
@@ -18,18 +26,117 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-class HindalcoPDFDownloader:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+class IncompleteDownloadError(Exception):
+    """The streamed body does not match the advertised size or is not a complete PDF"""
 
-    def format_date_for_url(self, date):
-        day = date.strftime("%d")
-        month = date.strftime("%B").lower()
-        year = date.strftime("%Y")
-        return day, month, year
+def is_complete_pdf(filepath):
+    """Cheap truncation check: a finished PDF starts with %PDF- and has %%EOF in its last KB"""
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                return False
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 1024))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+def parse_content_range(value):
+    """'bytes 100-999/1000' -> (100, 1000); total is None when the server sends '*'"""
+    try:
+        span, total = value.split(' ', 1)[1].split('/')
+        return int(span.split('-')[0]), (int(total) if total != '*' else None)
+    except (AttributeError, IndexError, ValueError):
+        raise IncompleteDownloadError(f"Invalid Content-Range: {value}")
+
+class PartFile:
+    """Temp file a download streams into, hashed as it grows and atomically renamed into place"""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.path = filepath + PART_SUFFIX
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.handle = None
+
+    def open(self, resume=False):
+        self.close()
+        if resume and self.size and os.path.exists(self.path):
+            self.handle = open(self.path, 'ab')
+        else:
+            self.size = 0
+            self.hasher = hashlib.sha256()
+            self.handle = open(self.path, 'wb')
+
+    def write(self, chunk):
+        self.handle.write(chunk)
+        self.hasher.update(chunk)
+        self.size += len(chunk)
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def discard(self):
+        self.close()
+        self.size = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def commit(self, expected_size=None):
+        """Verify, fsync and rename over filepath; returns the SHA-256 hex digest"""
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.close()
+
+        if expected_size is not None and self.size != expected_size:
+            raise IncompleteDownloadError(f"Got {self.size} of {expected_size} bytes")
+        if not is_complete_pdf(self.path):
+            raise IncompleteDownloadError("PDF is truncated (no %%EOF marker)")
+
+        os.replace(self.path, self.filepath)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(os.path.dirname(self.filepath) or '.', os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)  # make the rename itself durable
+            finally:
+                os.close(dir_fd)
+        return self.hasher.hexdigest()
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for retry number attempt (0-based)"""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** attempt)))
+
+class RateLimiter:
+    """Thread-safe per-host limiter spacing requests at least 1/rate seconds apart"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+class DownloaderBase:
+    """URL, path and date-index handling shared by the sync and async downloaders"""
+
+    def __init__(self, base_url=None, archive_dir=ARCHIVE_DIR):
+        # An explicit base_url pins a single template; otherwise URL_TEMPLATES are ranked by the resolver
+        self.base_url = base_url
+        self.archive_dir = archive_dir
+        self.index = DateIndex(root=archive_dir)
+        self.resolver = UrlResolver(templates=[base_url] if base_url else None, root=archive_dir)
 
     def format_date_for_filename(self, date):
         day = date.strftime("%d")
@@ -38,8 +145,19 @@ class HindalcoPDFDownloader:
         return day, month, year
 
     def construct_url(self, date):
-        day, month, year = self.format_date_for_url(date)
-        return BASE_URL.format(day, month, year)
+        """Most likely URL for date according to the resolver"""
+        return self.resolver.candidates(date)[0][1]
+
+    def known_url(self, date, entry):
+        """URL that last served the PDF for date, falling back to the best-ranked candidate"""
+        if entry and entry.get('url') and entry.get('outcome') == OUTCOME_DOWNLOADED:
+            return entry['url']
+        return self.construct_url(date)
+
+    def record_template(self, date, template, result):
+        """Feed a definitive answer (PDF or 404) back into the template ranking"""
+        if result['success'] or result['status'] == 404:
+            self.resolver.record(date, template, hit=result['success'])
 
     def construct_filename(self, date):
         day, month, year = self.format_date_for_filename(date)
@@ -48,91 +166,290 @@ class HindalcoPDFDownloader:
     def create_directory_structure(self, date):
         year = date.strftime("%Y")
         month = date.strftime("%b")
-        dir_path = os.path.join("Downloads", year, month)
+        dir_path = os.path.join(self.archive_dir, year, month)
         os.makedirs(dir_path, exist_ok=True)
         return dir_path
 
-    def download_pdf(self, url, filepath):
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_outcome(self, date, url, result, **extra):
+        if result['success'] or result.get('not_modified'):
+            outcome = OUTCOME_DOWNLOADED
+        elif result['status'] == 404:
+            outcome = OUTCOME_MISSING
+        else:
+            outcome = OUTCOME_ERROR
+        if result.get('sha256'):
+            extra.update(sha256=result['sha256'], size=result['size'])
+        metrics.inc('hindalco_dates_checked_total', outcome=outcome)
+        self.index.record(date, outcome, status=result['status'], url=url,
+                          etag=result['etag'], last_modified=result['last_modified'], **extra)
+
+    def needs_revalidation(self, date, entry, now=None):
+        now = now or datetime.now()
+        if now - date > timedelta(days=REVALIDATE_WINDOW_DAYS):
+            return False
+        if not entry or not entry.get('checked_at'):
+            return True
+        checked_at = datetime.fromisoformat(entry['checked_at'])
+        return now - checked_at >= timedelta(hours=REVALIDATE_AFTER_HOURS)
+
+class HindalcoPDFDownloader(DownloaderBase):
+    def __init__(self, pool_size=None, rate_limit=None, base_url=None, archive_dir=ARCHIVE_DIR, on_download=None):
+        super().__init__(base_url=base_url, archive_dir=archive_dir)
+        # Called as on_download(date, filepath) whenever a new or changed PDF is saved
+        self.on_download = on_download
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        if pool_size:
+            # One pooled connection per worker so concurrent backfills reuse sockets
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        self.rate_limiter = RateLimiter(rate_limit)
+
+    def probe_pdf(self, url):
+        """HEAD the url and return status, validators and size without fetching the body"""
+        result = {'status': None, 'etag': None, 'last_modified': None, 'content_length': None, 'is_pdf': False}
+        try:
+            self.rate_limiter.wait(url)
+            sent = time.perf_counter()
+            response = self.session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"HEAD request failed: {str(e)}")
+            metrics.record_request('HEAD', None, 0)
+            return result
+
+        metrics.record_request('HEAD', response.status_code, time.perf_counter() - sent)
+        result['status'] = response.status_code
+        result['etag'] = response.headers.get('ETag')
+        result['last_modified'] = response.headers.get('Last-Modified')
+        result['is_pdf'] = 'pdf' in response.headers.get('content-type', '').lower()
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit():
+            result['content_length'] = int(content_length)
+        return result
+
+    def fetch_pdf(self, url, filepath, validators=None):
+        """Download url to filepath and report the HTTP outcome as a dict
+
+        When validators (an index entry) are given the request is conditional and a
+        304 leaves filepath untouched. The body streams into filepath + '.part'; a
+        retry after a dropped connection resumes it with a Range request, and only a
+        verified, fsynced copy is renamed over filepath.
+        """
+        result = {'success': False, 'not_modified': False, 'status': None, 'etag': None, 'last_modified': None}
+        headers = self.conditional_headers(validators)
+        headers['Accept-Encoding'] = 'identity'  # byte offsets must match the stored bytes for Range resume
+        part = PartFile(filepath)
+        expected_size = None
+        resume_validator = None
+
         for attempt in range(MAX_RETRIES):
+            responded = False
             try:
                 logger.info(f"Attempting to download from: {url} (Attempt {attempt + 1}/{MAX_RETRIES})")
-                response = self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True)
-                response.raw.decode_content = True  # allow streaming decompression
+                request_headers = dict(headers)
+                if part.size and resume_validator:
+                    request_headers['Range'] = f"bytes={part.size}-"
+                    request_headers['If-Range'] = resume_validator
+                    logger.info(f"Resuming download at byte {part.size}")
+                self.rate_limiter.wait(url)
+                sent = time.perf_counter()
+                response = self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True, headers=request_headers)
+                responded = True
+                metrics.record_request('GET', response.status_code, time.perf_counter() - sent)
+                result['status'] = response.status_code
+                result['etag'] = response.headers.get('ETag')
+                result['last_modified'] = response.headers.get('Last-Modified')
+
+                if response.status_code == 304:
+                    logger.info(f"PDF not modified since last check: {filepath}")
+                    result['not_modified'] = True
+                    result['etag'] = result['etag'] or validators.get('etag')
+                    result['last_modified'] = result['last_modified'] or validators.get('last_modified')
+                    response.close()
+                    return result
 
-                if response.status_code == 200:
+                elif response.status_code in (200, 206):
                     content_type = response.headers.get('content-type', '').lower()
                     if 'pdf' not in content_type:
                         logger.warning(f"Invalid content type: {content_type} — not saving file.")
-                        return False
+                        response.close()
+                        break
 
-                    # Peek first few bytes to check for %PDF- header
-                    first_bytes = response.raw.read(5)
-                    if first_bytes != b'%PDF-':
-                        logger.warning("File content does not start with '%PDF-', skipping save.")
-                        return False
+                    if response.status_code == 206:
+                        start, expected_size = parse_content_range(response.headers.get('Content-Range'))
+                        if start != part.size:
+                            raise IncompleteDownloadError(f"Server resumed at byte {start}, expected {part.size}")
+                        part.open(resume=True)
+                    else:
+                        # Peek first few bytes to check for %PDF- header
+                        first_bytes = response.raw.read(5)
+                        if first_bytes != b'%PDF-':
+                            logger.warning("File content does not start with '%PDF-', skipping save.")
+                            response.close()
+                            break
+                        content_length = response.headers.get('Content-Length')
+                        expected_size = int(content_length) if content_length and content_length.isdigit() else None
+                        part.open(resume=False)
+                        part.write(first_bytes)
 
-                    with open(filepath, 'wb') as f:
-                        f.write(first_bytes)
-                        for chunk in response.raw:
-                            f.write(chunk)
+                    result['status'] = 200
+                    resume_validator = result['etag'] or result['last_modified']
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        part.write(chunk)
 
-                    file_size = os.path.getsize(filepath)
-                    logger.info(f"Successfully downloaded PDF: {filepath} ({file_size} bytes)")
-                    return True
+                    result['sha256'] = part.commit(expected_size)
+                    result['size'] = part.size
+                    metrics.record_transfer(part.size - (start if response.status_code == 206 else 0),
+                                            time.perf_counter() - sent)
+                    logger.info(f"Successfully downloaded PDF: {filepath} ({part.size} bytes, sha256 {result['sha256'][:12]})")
+                    result['success'] = True
+                    return result
 
                 elif response.status_code == 404:
                     logger.info("PDF not available for this date (404 Not Found)")
-                    return False
+                    response.content  # drain the small error body so the connection returns to the pool
+                    break
 
                 else:
                     logger.warning(f"Unexpected status code: {response.status_code}")
+                    response.content
                     if attempt < MAX_RETRIES - 1:
+                        metrics.inc('hindalco_http_retries_total', method='GET')
                         time.sleep(RETRY_DELAY)
                         continue
-                    return False
+                    break
 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, IncompleteDownloadError) as e:
                 logger.error(f"Request failed: {str(e)}")
+                if not responded:
+                    metrics.record_request('GET', None, 0)
+                result['status'] = None
+                part.close()
+                if not resume_validator or (expected_size is not None and part.size >= expected_size):
+                    part.discard()  # nothing trustworthy to resume from
                 if attempt < MAX_RETRIES - 1:
+                    metrics.inc('hindalco_http_retries_total', method='GET')
                     logger.info(f"Retrying in {RETRY_DELAY} seconds...")
                     time.sleep(RETRY_DELAY)
                 else:
                     logger.error("Max retries reached. Download failed.")
-                    return False
 
             except Exception as e:
                 logger.error(f"Unexpected error: {str(e)}")
-                return False
+                break
 
-        return False
+        part.discard()
+        return result
+
+    def notify_download(self, date, filepath):
+        if self.on_download is None:
+            return
+        try:
+            self.on_download(date, filepath)
+        except Exception as e:
+            logger.error(f"Download hook failed for {filepath}: {e}")
+
+    def download_pdf(self, url, filepath):
+        return self.fetch_pdf(url, filepath)['success']
 
     def download_today(self):
         today = datetime.now()
         return self.download_for_date(today)
 
-    def download_for_date(self, date):
+    def revalidate(self, date, url, filepath, entry):
+        """Check an existing file against the server copy and refresh it if it changed"""
+        if entry and (entry.get('etag') or entry.get('last_modified')):
+            result = self.fetch_pdf(url, filepath, validators=entry)
+            if result['success']:
+                logger.info(f"Server copy changed, refreshed: {filepath}")
+                self.notify_download(date, filepath)
+            if result['success'] or result['not_modified']:
+                self.record_outcome(date, url, result)
+            return True
+
+        # No stored validators yet: a HEAD is enough to learn them and compare sizes
+        probe = self.probe_pdf(url)
+        if probe['status'] != 200 or not probe['is_pdf']:
+            return True
+
+        local_size = os.path.getsize(filepath)
+        if probe['content_length'] is not None and probe['content_length'] != local_size:
+            logger.info(f"Server copy size {probe['content_length']} differs from local {local_size}, re-downloading")
+            result = self.fetch_pdf(url, filepath)
+            if result['success']:
+                self.record_outcome(date, url, result)
+                self.notify_download(date, filepath)
+            return True
+
+        self.index.record(date, OUTCOME_DOWNLOADED, status=probe['status'], url=url,
+                          etag=probe['etag'], last_modified=probe['last_modified'])
+        return True
+
+    def resolve_and_fetch(self, date, filepath, head_first=False):
+        """Try candidate URL templates best first until one serves the PDF; returns (result, url)"""
+        result, url = None, None
+        for template, url in self.resolver.candidates(date):
+            if head_first:
+                # Re-checking a known 404: HEAD first so the likely miss costs no body
+                probe = self.probe_pdf(url)
+                if probe['status'] == 404:
+                    result = {'success': False, 'not_modified': False, 'status': 404, 'etag': None, 'last_modified': None}
+                    self.record_template(date, template, result)
+                    continue
+
+            result = self.fetch_pdf(url, filepath)
+            self.record_template(date, template, result)
+            if result['status'] != 404:
+                break  # a hit, or a transient failure that other templates will not fix
+        return result, url
+
+    def download_for_date(self, date, force_probe=False):
         logger.info(f"Checking for PDF for date: {date.strftime('%Y-%m-%d')}")
-        url = self.construct_url(date)
         filename = self.construct_filename(date)
         dir_path = self.create_directory_structure(date)
         filepath = os.path.join(dir_path, filename)
+        entry = self.index.get(date)
+
+        if os.path.exists(filepath) and not is_complete_pdf(filepath):
+            logger.warning(f"Existing file is truncated, re-downloading: {filepath}")
+            os.remove(filepath)
 
         if os.path.exists(filepath):
+            if self.needs_revalidation(date, entry):
+                return self.revalidate(date, self.known_url(date, entry), filepath, entry)
             logger.info(f"File already exists: {filepath}")
             return True
 
-        success = self.download_pdf(url, filepath)
+        if not force_probe and not self.index.should_probe(date):
+            logger.info(f"Skipping {date.strftime('%Y-%m-%d')}: recorded as missing in date index")
+            return False
+
+        head_first = bool(entry and entry.get('outcome') == OUTCOME_MISSING)
+        result, url = self.resolve_and_fetch(date, filepath, head_first=head_first)
+        captured = {'captured_at': datetime.now().isoformat(timespec='seconds')} if result['success'] else {}
+        self.record_outcome(date, url, result, **captured)
+        success = result['success']
 
         if success:
             logger.info(f"Download completed successfully for {date.strftime('%Y-%m-%d')}")
+            self.notify_download(date, filepath)
         else:
             logger.info(f"No valid PDF available for {date.strftime('%Y-%m-%d')}")
 
         return success
 
-def main():
+def main(on_download=None):
     logger.info("Starting Hindalco PDF Downloader")
-    downloader = HindalcoPDFDownloader()
+    downloader = HindalcoPDFDownloader(on_download=on_download)
     success = downloader.download_today()
 
     if success:
@@ -0,0 +1,226 @@
+"""
+Filesystem-watch ingestion daemon for Hindalco PDF Downloader
+Watches the Downloads/ archive and the pdf/ drop folder and extracts each new PDF
+as soon as it is complete. Uses watchdog (inotify on Linux) when it is installed,
+otherwise an mtime poll that only lists directories whose mtime changed.
+
+Usage: python ingest_daemon.py   (or: python csv_manager_enhanced.py watch)
+"""
+
+import os
+import time
+import logging
+import threading
+from config import (PART_SUFFIX, WATCH_SETTLE_SECONDS, WATCH_POLL_SECONDS, WATCH_RESCAN_SECONDS, LOG_LEVEL, LOG_FORMAT,
+                    LOG_DATE_FORMAT)
+from downloader import is_complete_pdf
+from csv_manager_enhanced import (ARCHIVE_DIR, PDF_DIR, INGEST_MANIFEST_FILE, ensure_directories, load_ingest_manifest,
+                                  scan_archive, ingest_files, convert_pdfs, move_processed_pdfs, print_parse_times)
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # optional: fall back to polling
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards created, modified and renamed-to paths to the daemon"""
+
+    def __init__(self, daemon):
+        self.daemon = daemon
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.daemon.notice(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.daemon.notice(event.src_path)
+
+    def on_moved(self, event):
+        # The downloader writes <file>.part and renames it when verified
+        if not event.is_directory:
+            self.daemon.notice(event.dest_path)
+
+class IngestDaemon:
+    """Debounces new PDFs until they stop changing, then extracts them
+
+    A file is ready once its size and mtime have stayed the same for
+    settle_seconds and it ends with %%EOF. Files in the archive are ingested in
+    place through the ingest manifest; files in pdf/ are converted and moved to
+    the backup directory, as `convert` does. The pipeline and `ingest` may record
+    files meanwhile, so the manifest is always merged into the copy on disk.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, pdf_dir=PDF_DIR, manifest_file=INGEST_MANIFEST_FILE,
+                 settle_seconds=WATCH_SETTLE_SECONDS, poll_seconds=WATCH_POLL_SECONDS,
+                 rescan_seconds=WATCH_RESCAN_SECONDS, use_watchdog=True):
+        self.archive_dir = archive_dir
+        self.pdf_dir = pdf_dir
+        self.manifest_file = manifest_file
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.rescan_seconds = rescan_seconds
+        self.use_watchdog = use_watchdog and Observer is not None
+        self.manifest = load_ingest_manifest(manifest_file)
+        self.removed = set()  # archive PDFs that disappeared, dropped from the manifest on the next save
+        self.pending = {}  # path -> (size, mtime_ns, unchanged since)
+        self.seen = {}  # path -> (size, mtime_ns) of files already handled outside the manifest
+        self.pdf_dir_mtime = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.ingested = 0
+
+    def _in_archive(self, path):
+        return os.path.commonpath([os.path.abspath(path), os.path.abspath(self.archive_dir)]) == \
+            os.path.abspath(self.archive_dir)
+
+    def notice(self, path, st=None):
+        """Start (or keep) debouncing path; in-progress .part files and non-PDFs are ignored"""
+        if path.endswith(PART_SUFFIX) or not path.endswith('.pdf'):
+            return
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+        if self.seen.get(path) == (st.st_size, st.st_mtime_ns):
+            return
+        with self.lock:
+            if path not in self.pending:
+                self.pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic())
+
+    def poll_directories(self):
+        """Queue new or changed PDFs found by listing only directories whose mtime moved"""
+        if os.path.exists(self.archive_dir):
+            changed, removed = scan_archive(self.archive_dir, self.manifest)
+            self.removed.update(removed)
+            for path, st in changed:
+                self.notice(path, st)
+
+        try:
+            mtime_ns = os.stat(self.pdf_dir).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns != self.pdf_dir_mtime:
+            self.pdf_dir_mtime = mtime_ns
+            with os.scandir(self.pdf_dir) as entries:
+                for item in entries:
+                    if item.is_file():
+                        self.notice(item.path, item.stat())
+            self.seen = {path: key for path, key in self.seen.items() if os.path.exists(path)}
+
+        # A directory holding a file still being written must be listed again after a restart
+        with self.lock:
+            for path in self.pending:
+                entry = self.manifest['dirs'].get(os.path.dirname(path))
+                if entry:
+                    entry['mtime_ns'] = None
+
+    def ready_files(self, now=None):
+        """Pop the pending files that have settled; returns [(path, stat)] complete enough to extract"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        with self.lock:
+            for path, (size, mtime_ns, since) in list(self.pending.items()):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del self.pending[path]  # renamed or deleted before it settled
+                    continue
+                if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                    self.pending[path] = (st.st_size, st.st_mtime_ns, now)
+                elif now - since >= self.settle_seconds:
+                    del self.pending[path]
+                    ready.append((path, st))
+
+        complete = []
+        for path, st in ready:
+            if is_complete_pdf(path):
+                complete.append((path, st))
+            else:
+                # Retried only if the file changes again
+                logger.warning(f"Skipping {path}: stopped changing but has no %%EOF (truncated?)")
+                self.seen[path] = (st.st_size, st.st_mtime_ns)
+        return complete
+
+    def ingest_ready(self, now=None):
+        """Extract every settled file; returns how many were handed to the extractor"""
+        ready = self.ready_files(now)
+        if not ready:
+            return 0
+
+        archived = [(path, st) for path, st in ready if self._in_archive(path)]
+        dropped = [path for path, _ in ready if not self._in_archive(path)]
+
+        if archived:
+            # Dedup against what other processes recorded since our last save
+            self.manifest['files'] = load_ingest_manifest(self.manifest_file)['files']
+            parse_times = ingest_files(archived, self.manifest, self.manifest_file, self.removed)
+            self.removed = set()
+            print_parse_times(parse_times)
+        if dropped:
+            extracted, parse_times = convert_pdfs(dropped)
+            for path, st in ready:
+                if path in dropped and os.path.exists(path) and not extracted.get(path):
+                    self.seen[path] = (st.st_size, st.st_mtime_ns)
+            move_processed_pdfs(extracted)
+            print_parse_times(parse_times)
+
+        self.ingested += len(ready)
+        logger.info(f"Ingested {len(ready)} PDFs ({len(archived)} archived, {len(dropped)} from {self.pdf_dir})")
+        return len(ready)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_forever(self):
+        """Catch up on anything added while stopped, then watch until stop() or Ctrl+C"""
+        ensure_directories()
+        self.poll_directories()
+
+        observer = None
+        if self.use_watchdog:
+            observer = Observer()
+            handler = _EventHandler(self)
+            for directory in [self.archive_dir, self.pdf_dir]:
+                if os.path.exists(directory):
+                    observer.schedule(handler, directory, recursive=True)
+            observer.start()
+            logger.info(f"Watching {self.archive_dir} and {self.pdf_dir} with {type(observer).__name__}")
+        else:
+            logger.info(f"Polling {self.archive_dir} and {self.pdf_dir} every {self.poll_seconds}s")
+
+        last_scan = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                # With events, a full poll is only a safety net for missed or overflowed notifications
+                if not observer or now - last_scan >= self.rescan_seconds:
+                    self.poll_directories()
+                    last_scan = now
+                try:
+                    self.ingest_ready()
+                except Exception as e:
+                    logger.error(f"Ingest failed: {e}")
+                self.stop_event.wait(self.poll_seconds)
+        except KeyboardInterrupt:
+            print("\n👋 Watcher stopped by user")
+        finally:
+            if observer:
+                observer.stop()
+                observer.join()
+
+def watch(**kwargs):
+    print("👀 INGEST WATCHER")
+    print("=" * 60)
+    if Observer is None:
+        print("ℹ️  watchdog not installed; falling back to mtime polling")
+    IngestDaemon(**kwargs).run_forever()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    watch()
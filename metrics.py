@@ -0,0 +1,254 @@
+"""
+Metrics and tracing for Hindalco PDF Downloader
+Counters and histograms kept in process and exported as Prometheus text (for the
+node_exporter textfile collector) or JSON lines, plus optional per-stage spans.
+Disabled by default: every call then returns after a single flag check.
+
+Enable with METRICS_ENABLED in config.py, `python run.py --metrics`, or metrics.enable().
+"""
+
+import os
+import json
+import time
+import atexit
+import itertools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from config import (METRICS_ENABLED, METRICS_PROMETHEUS_FILE, METRICS_JSONL_FILE, METRICS_TRACE_FILE,
+                    METRICS_EXPORT_SECONDS)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+THROUGHPUT_BUCKETS = (1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)  # bytes per second
+CAPTURE_BUCKETS = (60, 300, 600, 1800, 3600, 7200, 14400, 28800, 86400)  # seconds after publish
+
+# name -> (type, help, histogram buckets)
+DEFINITIONS = {
+    'hindalco_http_requests_total': ('counter', 'HTTP requests by method and status ("error" when no response)', None),
+    'hindalco_http_request_seconds': ('histogram', 'Time from sending a request to its response headers', LATENCY_BUCKETS),
+    'hindalco_http_retries_total': ('counter', 'Request attempts retried after an error or unexpected status', None),
+    'hindalco_download_bytes_total': ('counter', 'PDF bytes received', None),
+    'hindalco_download_seconds': ('histogram', 'Time to download a PDF body, headers included', LATENCY_BUCKETS),
+    'hindalco_download_bytes_per_second': ('histogram', 'Throughput of each PDF download', THROUGHPUT_BUCKETS),
+    'hindalco_dates_checked_total': ('counter', 'Dates resolved by the downloaders, by outcome', None),
+    'hindalco_pdf_parse_seconds': ('histogram', 'Time to extract one PDF, cache lookups included', LATENCY_BUCKETS),
+    'hindalco_rows_extracted_total': ('counter', 'Product rows extracted from PDFs', None),
+    'hindalco_csv_write_seconds': ('histogram', 'Time to write one product CSV, by kind of write', LATENCY_BUCKETS),
+    'hindalco_csv_rows_written_total': ('counter', 'Rows written to the product CSVs', None),
+    'hindalco_pipeline_stage_seconds': ('histogram', 'Download -> extract -> store pipeline stage time', LATENCY_BUCKETS),
+    'hindalco_time_to_capture_seconds': ('histogram', 'Delay between a circular being published and captured', CAPTURE_BUCKETS),
+}
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count], sum
+_trace_file = None
+_span_ids = itertools.count(1)
+_span_stack = threading.local()
+_exports = {}
+_exporter = None
+
+def enabled():
+    return _enabled
+
+def enable(prometheus_file=METRICS_PROMETHEUS_FILE, jsonl_file=METRICS_JSONL_FILE, trace_file=METRICS_TRACE_FILE,
+           export_seconds=METRICS_EXPORT_SECONDS):
+    """Start collecting; the given files are written every export_seconds and at exit (None skips one)"""
+    global _enabled, _trace_file, _exporter
+    _exports.update(prometheus_file=prometheus_file, jsonl_file=jsonl_file)
+    _trace_file = trace_file
+    if trace_file:
+        os.makedirs(os.path.dirname(trace_file) or ".", exist_ok=True)
+    if not _enabled:
+        atexit.register(export)
+        if export_seconds:
+            _exporter = threading.Thread(target=_export_loop, args=(export_seconds,), name="metrics-export", daemon=True)
+            _exporter.start()
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, value, **labels):
+    if not _enabled:
+        return
+    buckets = DEFINITIONS[name][2]
+    key = _key(name, labels)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+        entry[0][bisect_left(buckets, value)] += 1
+        entry[1] += value
+
+# Instrumentation helpers for the hot paths
+
+def record_request(method, status, seconds):
+    """One HTTP exchange; status is the HTTP code, or None when the request failed without a response"""
+    if not _enabled:
+        return
+    inc('hindalco_http_requests_total', method=method, status=status or 'error')
+    if status:
+        observe('hindalco_http_request_seconds', seconds, method=method)
+
+def record_transfer(size, seconds):
+    """A PDF body of size bytes fully received in seconds"""
+    if not _enabled:
+        return
+    inc('hindalco_download_bytes_total', size)
+    observe('hindalco_download_seconds', seconds)
+    if seconds > 0:
+        observe('hindalco_download_bytes_per_second', size / seconds)
+
+def record_extraction(seconds, rows):
+    if not _enabled:
+        return
+    observe('hindalco_pdf_parse_seconds', seconds)
+    inc('hindalco_rows_extracted_total', rows)
+
+def record_csv_write(kind, seconds, rows):
+    if not _enabled:
+        return
+    observe('hindalco_csv_write_seconds', seconds, kind=kind)
+    inc('hindalco_csv_rows_written_total', rows, kind=kind)
+
+@contextmanager
+def _span(name, attrs):
+    parents = _span_stack.__dict__.setdefault('ids', [])
+    span_id = next(_span_ids)
+    started_at = datetime.now().isoformat(timespec='milliseconds')
+    started = time.perf_counter()
+    parents.append(span_id)
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        parents.pop()
+        record = {'span': span_id, 'parent': parents[-1] if parents else None, 'name': name, 'start': started_at,
+                  'duration_s': round(time.perf_counter() - started, 6), 'thread': threading.current_thread().name}
+        if attrs:
+            record['attrs'] = attrs
+        if error:
+            record['error'] = error
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with _lock, open(_trace_file, 'a') as f:
+                f.write(line)
+        except OSError:
+            pass  # tracing must never fail the traced work
+
+def span(name, **attrs):
+    """Time a block as a trace span written to the trace file; a shared no-op unless tracing is on"""
+    if not _enabled or not _trace_file:
+        return _NO_SPAN
+    return _span(name, attrs)
+
+_NO_SPAN = nullcontext()
+
+# Exporters
+
+def snapshot():
+    """{'counters': [...], 'histograms': [...]} with labels as dicts"""
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), (counts, total) in sorted(_histograms.items()):
+            buckets = DEFINITIONS[name][2]
+            histograms.append({'name': name, 'labels': dict(labels), 'count': sum(counts), 'sum': round(total, 6),
+                               'buckets': dict(zip([str(b) for b in buckets] + ['+Inf'], counts))})
+    return {'counters': counters, 'histograms': histograms}
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(counts), total)) for key, (counts, total) in _histograms.items())
+
+    lines = []
+    described = set()
+    def describe(name):
+        if name not in described:
+            described.add(name)
+            kind, help_text = DEFINITIONS.get(name, ('untyped', ''))[:2]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        describe(name)
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    for (name, labels), (counts, total) in histograms:
+        describe(name)
+        cumulative = 0
+        for bound, count in zip(list(DEFINITIONS[name][2]) + ['+Inf'], counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, [('le', str(bound))])} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path=METRICS_PROMETHEUS_FILE):
+    """Atomically replace path, so a scraper never reads a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", 'w') as f:
+        f.write(prometheus_text())
+    os.replace(f"{path}.tmp", path)
+
+def append_jsonl(path=METRICS_JSONL_FILE):
+    """Append one timestamped snapshot line"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(dict(snapshot(), time=datetime.now().isoformat(timespec='seconds'), pid=os.getpid()))
+    with open(path, 'a') as f:
+        f.write(line + "\n")
+
+def export():
+    """Write the configured exporter files"""
+    if _exports.get('prometheus_file'):
+        write_prometheus(_exports['prometheus_file'])
+    if _exports.get('jsonl_file'):
+        append_jsonl(_exports['jsonl_file'])
+
+def _export_loop(interval):
+    while True:
+        time.sleep(interval)
+        if _enabled:
+            try:
+                export()
+            except OSError:
+                pass
+
+if METRICS_ENABLED:
+    enable()
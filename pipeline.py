@@ -0,0 +1,156 @@
+"""
+In-process download -> extract -> store pipeline for Hindalco PDF Downloader
+The downloader hands each newly saved PDF to a background worker through a
+bounded queue; the worker extracts it and commits the rows to the CSVs, the
+Parquet store and the SQLite database, so rates are queryable seconds after capture
+"""
+
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+import metrics
+from config import PIPELINE_QUEUE_SIZE, PIPELINE_BATCH_SIZE
+from csv_manager_enhanced import (CsvBatchWriter, create_csv_filename, ensure_directories, extract_pdf_data,
+                                  sync_price_store, sync_price_db, record_ingested)
+
+logger = logging.getLogger(__name__)
+
+STAGES = ['download', 'queue_wait', 'extract', 'csv', 'store', 'end_to_end']
+
+class IngestPipeline:
+    """Use as `with IngestPipeline() as pipeline:` and pass pipeline.submit as the downloader's on_download
+
+    submit() blocks while the queue is full, so a fast backfill cannot run
+    arbitrarily far ahead of extraction. The downloader only submits new or
+    refreshed copies, so a submitted PDF's rows replace any stored for its date.
+    """
+
+    def __init__(self, queue_size=PIPELINE_QUEUE_SIZE, batch_size=PIPELINE_BATCH_SIZE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.timings = {stage: [] for stage in STAGES}
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.rows_written = 0
+        self.worker = threading.Thread(target=self._run, name="ingest-pipeline", daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        ensure_directories()
+        self.worker.start()
+
+    def close(self):
+        """Drain the queue and stop the worker"""
+        self.queue.put(None)
+        self.worker.join()
+
+    def submit(self, date, filepath):
+        self.queue.put((date, filepath, time.perf_counter()))
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.timings[stage].append(seconds)
+        metrics.observe('hindalco_pipeline_stage_seconds', seconds, stage=stage)
+
+    @contextmanager
+    def stage(self, name, **attrs):
+        """Time a block of work as one sample of the named stage (and a trace span when tracing is on)"""
+        started = time.perf_counter()
+        try:
+            with metrics.span(f"pipeline.{name}", **attrs):
+                yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def _next_batch(self):
+        """Block for one item, then take whatever else is already queued; None means stop after this batch"""
+        item = self.queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                try:
+                    self.process(batch)
+                except Exception as e:
+                    logger.error(f"Pipeline failed on {[filepath for _, filepath, _ in batch]}: {e}")
+            if stop:
+                return
+
+    def process(self, batch):
+        started = time.perf_counter()
+        for _, _, submitted in batch:
+            self.record('queue_wait', started - submitted)
+
+        extracted = {}
+        writer = CsvBatchWriter()
+        for _, filepath, _ in batch:
+            parse_started = time.perf_counter()
+            with self.stage('extract', pdf=filepath):
+                products_data = extract_pdf_data(filepath)
+            metrics.record_extraction(time.perf_counter() - parse_started, len(products_data))
+            extracted[filepath] = len(products_data)
+            for product in products_data:
+                writer.add(product, create_csv_filename(product['description']), source=filepath, replace=True)
+
+        with self.stage('csv'):
+            written, failed = writer.commit()
+        with self.stage('store'):
+            sync_price_store(written)
+            sync_price_db(written)
+        # A PDF whose rows were not all written stays unrecorded, so `ingest` retries it
+        unstored = set().union(*failed.values())
+        for filepath in sorted(unstored):
+            logger.error(f"Rows from {filepath} were not all written; left for the next ingest")
+        record_ingested({filepath: count for filepath, count in extracted.items() if filepath not in unstored})
+
+        finished = time.perf_counter()
+        for _, _, submitted in batch:
+            self.record('end_to_end', finished - submitted)
+        with self.lock:
+            self.processed += len(batch)
+            self.rows_written += len(written)
+        logger.info(f"Pipeline stored {len(written)} rows from {len(batch)} PDFs "
+                    f"in {finished - started:.2f}s")
+
+    def stage_summary(self):
+        """{stage: {count, total_s, mean_s, max_s}} for every stage with samples"""
+        with self.lock:
+            timings = {stage: list(samples) for stage, samples in self.timings.items() if samples}
+        return {
+            stage: {
+                'count': len(samples),
+                'total_s': round(sum(samples), 4),
+                'mean_s': round(sum(samples) / len(samples), 4),
+                'max_s': round(max(samples), 4),
+            }
+            for stage, samples in timings.items()
+        }
+
+def print_stage_timings(pipeline):
+    summary = pipeline.stage_summary()
+    print(f"\n⏱️  PIPELINE: {pipeline.processed} PDFs, {pipeline.rows_written} rows stored")
+    for stage in STAGES:
+        if stage in summary:
+            s = summary[stage]
+            print(f"   {stage:<11} n={s['count']:<4} mean {s['mean_s'] * 1000:8.1f} ms  max {s['max_s'] * 1000:8.1f} ms")
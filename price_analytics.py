@@ -0,0 +1,165 @@
+"""
+Price analytics over the full Hindalco rate history
+Loads every product series once into an aligned date x product frame and computes
+deltas, rolling averages, volatility, month-over-month change and spreads in vectorized form
+
+Python API:
+    matrix = load_price_matrix()
+    price_changes(matrix), rolling_average(matrix, '30D'), rolling_volatility(matrix, '90D'),
+    month_over_month(matrix),
+    spread(matrix, '6_Billets_AA6063_Dia_7_8_9_-_subject_to_availabili', '3_CG_Grade_Ingot_Sow_995_min_purity')
+
+Usage: python price_analytics.py <summary|changes|mom|spread A B> [--from DATE] [--to DATE] [--window 30D] [--json]
+"""
+
+import os
+import csv
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import price_store
+from csv_tools import CSV_DIR, list_csv_files
+
+def _frame_from_csvs(csv_dir):
+    frames = []
+    for filename in list_csv_files(csv_dir):
+        with open(os.path.join(csv_dir, filename), 'r', newline='') as f:
+            rows = [(row['Date'], row['Price']) for row in csv.DictReader(f)]
+        if rows:
+            frame = pd.DataFrame(rows, columns=['date', 'price'])
+            frame['product_id'] = price_store.product_id_for(filename)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['date', 'product_id', 'price'])
+    return pd.concat(frames, ignore_index=True)
+
+def load_price_matrix(start=None, end=None, csv_dir=CSV_DIR):
+    """Prices as a date x product_id frame (NaN where a product has no circular that day)
+
+    Reads the columnar store when present, with the date range pushed down;
+    otherwise the per-product CSVs.
+    """
+    if price_store.store_exists():
+        long = price_store.load_prices(start=start, end=end, columns=['date', 'product_id', 'price'])
+    else:
+        long = _frame_from_csvs(csv_dir)
+
+    if long.empty:
+        return pd.DataFrame(dtype='float64', index=pd.DatetimeIndex([], name='date'))
+
+    long = long.assign(date=pd.to_datetime(long['date']), price=pd.to_numeric(long['price'], errors='coerce'))
+    if start is not None:
+        long = long[long['date'] >= pd.Timestamp(start)]
+    if end is not None:
+        long = long[long['date'] <= pd.Timestamp(end)]
+
+    matrix = long.pivot_table(index='date', columns='product_id', values='price', aggfunc='last')
+    matrix.columns.name = None
+    return matrix.sort_index().astype('float64')
+
+def resolve_product(matrix, term):
+    """Column for term: an exact product_id, else the single column containing it (case-insensitive)"""
+    if term in matrix.columns:
+        return term
+    needle = term.lower().replace(' ', '_')
+    matches = [column for column in matrix.columns if needle in column.lower()]
+    if len(matches) != 1:
+        raise KeyError(f"'{term}' matches {len(matches)} products: {', '.join(matches) or 'none'}")
+    return matches[0]
+
+def price_changes(matrix):
+    """Change since the previous circular, per product; rate gaps carry the last price forward"""
+    return matrix.ffill().diff().where(matrix.notna())
+
+def percent_changes(matrix):
+    return matrix.ffill().pct_change(fill_method=None).where(matrix.notna()) * 100
+
+def rolling_average(matrix, window='30D'):
+    """Time-based rolling mean; window is a pandas offset such as '30D' or an observation count"""
+    return matrix.rolling(window, min_periods=1).mean()
+
+def rolling_volatility(matrix, window='90D'):
+    """Rolling standard deviation of percent changes between circulars"""
+    return percent_changes(matrix).rolling(window, min_periods=2).std()
+
+def monthly_prices(matrix):
+    """Last price of each calendar month per product"""
+    return matrix.groupby(matrix.index.to_period('M')).last()
+
+def month_over_month(matrix):
+    """Percent change of each month's closing price against the previous month"""
+    return monthly_prices(matrix).pct_change(fill_method=None) * 100
+
+def spread(matrix, product_a, product_b):
+    """Price of product_a minus product_b on each date both are (carried) known"""
+    filled = matrix.ffill()
+    return (filled[resolve_product(matrix, product_a)] - filled[resolve_product(matrix, product_b)]).dropna()
+
+def summary_table(matrix, window='30D'):
+    """One row per product: latest price, last change, rolling average and volatility, history span"""
+    if matrix.empty:
+        return pd.DataFrame()
+    filled = matrix.ffill()
+    table = pd.DataFrame({
+        'latest': filled.iloc[-1],
+        'change': price_changes(matrix).ffill().iloc[-1],
+        'change_pct': percent_changes(matrix).ffill().iloc[-1],
+        f'avg_{window}': rolling_average(matrix, window).iloc[-1],
+        f'volatility_{window}': rolling_volatility(matrix, window).iloc[-1],
+        'min': matrix.min(),
+        'max': matrix.max(),
+        'records': matrix.notna().sum(),
+        'first': matrix.apply(pd.Series.first_valid_index),
+        'last': matrix.apply(pd.Series.last_valid_index),
+    })
+    return table.sort_index()
+
+def _frame_json(frame):
+    frame = frame.copy()
+    frame.index = frame.index.astype(str)
+    frame = frame.replace({np.nan: None})
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime("%Y-%m-%d")
+    return json.loads(frame.to_json(orient='index', date_format='iso'))
+
+def _print_frame(frame, as_json):
+    if as_json:
+        print(json.dumps(_frame_json(frame), indent=2))
+    elif frame.empty:
+        print("❌ No price data")
+    else:
+        numeric = frame.select_dtypes('number').columns
+        print(frame.assign(**frame[numeric].round(2)).to_string())
+
+def main():
+    parser = argparse.ArgumentParser(description='Hindalco price analytics')
+    parser.add_argument('command', choices=['summary', 'changes', 'mom', 'spread'])
+    parser.add_argument('products', nargs='*', help='Two products (id or name fragment) for spread')
+    parser.add_argument('--from', dest='start', help='First date, YYYY-MM-DD')
+    parser.add_argument('--to', dest='end', help='Last date, YYYY-MM-DD')
+    parser.add_argument('--window', default='30D', help='Rolling window for summary (default 30D)')
+    parser.add_argument('--json', action='store_true', help='Machine-readable output')
+    args = parser.parse_args()
+
+    matrix = load_price_matrix(args.start, args.end)
+
+    if args.command == 'summary':
+        _print_frame(summary_table(matrix, args.window), args.json)
+    elif args.command == 'changes':
+        _print_frame(price_changes(matrix).dropna(how='all'), args.json)
+    elif args.command == 'mom':
+        _print_frame(month_over_month(matrix).dropna(how='all'), args.json)
+    elif args.command == 'spread':
+        if len(args.products) != 2:
+            parser.error("spread needs two products")
+        try:
+            series = spread(matrix, *args.products)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return
+        _print_frame(series.to_frame('spread'), args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+SQLite price database for the Hindalco rate history
+(product_id, date) primary key for upserts, plus a date index for cross-product range queries
+"""
+
+import os
+import csv
+import sqlite3
+
+CSV_DIR = "csv"
+STORE_DIR = "store"
+PRICE_DB_PATH = os.path.join(STORE_DIR, "prices.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    product_id  TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    description TEXT NOT NULL,
+    price       INTEGER NOT NULL,
+    PRIMARY KEY (product_id, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_by_date ON prices (date, product_id);
+"""
+
+UPSERT = """
+INSERT INTO prices (product_id, date, description, price) VALUES (?, ?, ?, ?)
+ON CONFLICT (product_id, date) DO UPDATE SET description = excluded.description, price = excluded.price
+"""
+
+def db_exists(db_path=PRICE_DB_PATH):
+    return os.path.exists(db_path)
+
+def connect(db_path=PRICE_DB_PATH):
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _params(rows):
+    return [(row['product_id'], row['Date'], row['Description'], int(row['Price'])) for row in rows]
+
+def upsert_prices(rows, db_path=PRICE_DB_PATH):
+    """Insert or replace CSV-style rows (product_id, Date, Description, Price) in one transaction"""
+    if not rows:
+        return 0
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany(UPSERT, _params(rows))
+    finally:
+        conn.close()
+    return len(rows)
+
+def rebuild_price_db(csv_dir=CSV_DIR, db_path=PRICE_DB_PATH):
+    """Load every per-product CSV into the database"""
+    rows = []
+    for filename in sorted(os.listdir(csv_dir)) if os.path.exists(csv_dir) else []:
+        if not filename.endswith('.csv') or filename.startswith('backup_'):
+            continue
+        product_id = os.path.splitext(filename)[0]
+        with open(os.path.join(csv_dir, filename), 'r', newline='') as f:
+            rows.extend(dict(row, product_id=product_id) for row in csv.DictReader(f))
+    return upsert_prices(rows, db_path)
+
+def sync_prices(rows, csv_dir=CSV_DIR, db_path=PRICE_DB_PATH):
+    """Upsert freshly written rows, building the database from the CSVs first if it is missing"""
+    if not db_exists(db_path):
+        rebuild_price_db(csv_dir, db_path)
+    return upsert_prices(rows, db_path)
+
+# Walks the distinct product_ids through the primary key, then reads each product's
+# newest row from the same index, so the cost is per product rather than per row
+LATEST_DESCRIPTIONS = """
+WITH RECURSIVE products(product_id) AS (
+    SELECT MIN(product_id) FROM prices
+    UNION ALL
+    SELECT (SELECT MIN(product_id) FROM prices WHERE product_id > products.product_id)
+    FROM products WHERE products.product_id IS NOT NULL
+)
+SELECT product_id,
+       (SELECT description FROM prices WHERE prices.product_id = products.product_id ORDER BY date DESC LIMIT 1)
+FROM products WHERE product_id IS NOT NULL
+"""
+
+def match_products(conn, term):
+    """product_ids whose id or latest description contains term (case-insensitive)"""
+    term = term.lower().replace(' ', '_')
+    products = conn.execute(LATEST_DESCRIPTIONS).fetchall()
+    return [product_id for product_id, description in products
+            if term in product_id.lower() or term.replace('_', ' ') in description.lower()]
+
+def query_prices(product=None, start=None, end=None, db_path=PRICE_DB_PATH):
+    """Rows (product_id, date, description, price) for an optional product match and inclusive date range"""
+    conn = connect(db_path)
+    try:
+        clauses, params = [], []
+        if product:
+            product_ids = match_products(conn, product)
+            if not product_ids:
+                return []
+            clauses.append(f"product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if start:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end:
+            clauses.append("date <= ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return conn.execute(
+            f"SELECT product_id, date, description, price FROM prices {where} ORDER BY date, product_id",
+            params
+        ).fetchall()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        count = rebuild_price_db()
+        print(f"✅ Price database rebuilt with {count} rows: {PRICE_DB_PATH}")
+    else:
+        print("Usage: python price_db.py rebuild   - Rebuild the SQLite price database from csv/")
@@ -0,0 +1,147 @@
+"""
+Columnar price store for the Hindalco rate history
+A Parquet table (date, product_id, description, price) split into one file per year
+and sorted by date, kept in sync with the per-product CSVs, which remain the export
+format. An upsert rewrites only the years its rows fall in.
+"""
+
+import os
+import csv
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import price_db
+from file_lock import file_lock
+
+CSV_DIR = "csv"
+STORE_DIR = "store"
+PRICE_STORE_PATH = os.path.join(STORE_DIR, "prices")  # <year>.parquet files, read together as one dataset
+ROW_GROUP_SIZE = 50000  # rows per row group; min/max stats per group drive predicate pushdown
+
+SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('product_id', pa.string()),
+    ('description', pa.string()),
+    ('price', pa.int64()),
+])
+
+def product_id_for(csv_filename):
+    """Product key used in the store: the CSV filename without extension"""
+    return os.path.splitext(os.path.basename(csv_filename))[0]
+
+def _year_path(year):
+    return os.path.join(PRICE_STORE_PATH, f"{year}.parquet")
+
+def _years():
+    """Years with a file in the store; temp files start with '.' and are skipped, as pyarrow skips them"""
+    if not os.path.isdir(PRICE_STORE_PATH):
+        return []
+    return sorted(int(name[:-8]) for name in os.listdir(PRICE_STORE_PATH)
+                  if name.endswith('.parquet') and name[:-8].isdigit())
+
+def store_exists():
+    return bool(_years())
+
+def _to_frame(rows):
+    """Normalise CSV-style rows (product_id, Date, Description, Price) into the store's typed columns"""
+    frame = pd.DataFrame(rows, columns=['product_id', 'Date', 'Description', 'Price'])
+    return pd.DataFrame({
+        'date': pd.to_datetime(frame['Date'], format="%Y-%m-%d").dt.date,
+        'product_id': frame['product_id'].astype(str),
+        'description': frame['Description'].astype(str),
+        'price': pd.to_numeric(frame['Price']).astype('int64'),
+    })
+
+def _write_year(year, frame):
+    frame = frame.sort_values(['date', 'product_id'], kind='stable').reset_index(drop=True)
+    table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+    os.makedirs(PRICE_STORE_PATH, exist_ok=True)
+    tmp_path = os.path.join(PRICE_STORE_PATH, f".{year}.parquet.tmp")
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, write_statistics=True)
+    os.replace(tmp_path, _year_path(year))
+    return len(frame)
+
+def _by_year(frame):
+    return frame.groupby(frame['date'].map(lambda day: day.year), sort=True)
+
+def upsert_prices(rows):
+    """Merge rows into the store; a (product_id, date) already present is replaced
+
+    Only the files of the years the rows fall in are read and rewritten.
+    """
+    if not rows:
+        return 0
+    with file_lock(PRICE_STORE_PATH):
+        for year, new in _by_year(_to_frame(rows)):
+            if os.path.exists(_year_path(year)):
+                existing = pq.read_table(_year_path(year), memory_map=True).to_pandas()
+                new = pd.concat([existing, new], ignore_index=True)
+            _write_year(year, new.drop_duplicates(subset=['product_id', 'date'], keep='last'))
+    return len(rows)
+
+def rebuild_price_store(csv_dir=CSV_DIR):
+    """Rebuild the store from the per-product CSVs"""
+    rows = []
+    for filename in sorted(os.listdir(csv_dir)) if os.path.exists(csv_dir) else []:
+        if not filename.endswith('.csv') or filename.startswith('backup_'):
+            continue
+        with open(os.path.join(csv_dir, filename), 'r', newline='') as f:
+            product_id = product_id_for(filename)
+            rows.extend(dict(row, product_id=product_id) for row in csv.DictReader(f))
+    if not rows:
+        return 0
+    frame = _to_frame(rows).drop_duplicates(subset=['product_id', 'date'], keep='last')
+    with file_lock(PRICE_STORE_PATH):
+        stale = set(_years())
+        for year, group in _by_year(frame):
+            _write_year(year, group)
+            stale.discard(year)
+        for year in stale:
+            os.remove(_year_path(year))
+    return len(frame)
+
+def rebuild_price_stores(csv_dir=CSV_DIR):
+    """Rebuild the store and the SQLite price database after CSV files were replaced wholesale"""
+    try:
+        rebuild_price_store(csv_dir)
+        if price_db.db_exists():
+            os.remove(price_db.PRICE_DB_PATH)
+        price_db.rebuild_price_db(csv_dir)
+        print("🗄️  Price store and database rebuilt")
+    except Exception as e:
+        print(f"⚠️  Error rebuilding price stores: {e}")
+
+def load_prices(product_id=None, start=None, end=None, columns=None):
+    """Read prices as a DataFrame, skipping years outside the range and pushing product and
+    date predicates down to the row groups
+
+    start and end are inclusive and may be date objects or YYYY-MM-DD strings.
+    """
+    years = _years()
+    if start is not None:
+        years = [year for year in years if year >= pd.Timestamp(start).year]
+    if end is not None:
+        years = [year for year in years if year <= pd.Timestamp(end).year]
+    if not years:
+        return pd.DataFrame(columns=columns or SCHEMA.names)
+
+    filters = []
+    if product_id is not None:
+        filters.append(('product_id', '=', product_id))
+    if start is not None:
+        filters.append(('date', '>=', pd.Timestamp(start).date()))
+    if end is not None:
+        filters.append(('date', '<=', pd.Timestamp(end).date()))
+
+    table = pq.read_table([_year_path(year) for year in years], schema=SCHEMA, columns=columns,
+                          filters=filters or None, memory_map=True)
+    return table.to_pandas()
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        count = rebuild_price_store()
+        print(f"✅ Price store rebuilt with {count} rows: {PRICE_STORE_PATH}")
+    else:
+        print("Usage: python price_store.py rebuild   - Rebuild the Parquet store from csv/")
@@ -0,0 +1,180 @@
+"""
+Product catalog and duplicate-product merging for the per-product CSVs
+Near-duplicate product files (e.g. from text-fallback extraction) are clustered
+through an inverted token index, checked against the EXPECTED_PRODUCTS catalog and merged
+"""
+
+import os
+import re
+import csv
+from collections import Counter, defaultdict
+import csv_snapshots
+from csv_tools import CSV_DIR, list_csv_files, write_csv_atomic
+
+# Expected 7 line items from your PDF
+EXPECTED_PRODUCTS = [
+    "P0405 (Si 0.04% max, Fe 0.06% max) 99.85% (min)",
+    "P0610 (99.85% min) /P1020/ EC Grade Ingot & Sow 99.7% (min) / Cast Bar",
+    "CG Grade Ingot & Sow 99.5% (min) purity",
+    "EC Grade Wire Rods, Dia 9.5 mm - Conductivity 61% min",
+    "6201 Alloy Wire Rod - Dia 9.5 mm (HAC-1)",
+    "Billets (AA6063) Dia 7\", 8\" & 9\" - subject to availability",
+    "Billets (AA6063) Dia 5\", 6\" - subject to availability"
+]
+
+MIN_OVERLAP = 0.8  # shared tokens / tokens of the shorter name for two names to be the same product
+MAX_TOKEN_SHARE = 0.5  # tokens in more than this share of names are too common to generate candidates
+
+def create_csv_filename(description):
+    """Create a safe filename from product description"""
+    # Remove special characters and limit length
+    safe_name = re.sub(r'[^\w\s-]', '', description)
+    safe_name = re.sub(r'\s+', '_', safe_name)
+    safe_name = safe_name[:50]  # Limit length
+    return f"{safe_name}.csv"
+
+def name_tokens(name):
+    """Lowercase word tokens of a description or CSV filename, spelled as create_csv_filename spells them"""
+    stem = create_csv_filename(name)[:-4] if not name.endswith('.csv') else name[:-4]
+    return frozenset(token for token in re.split(r'[\W_]+', stem.lower()) if token)
+
+def same_product(tokens_a, tokens_b):
+    """Most tokens of the shorter name are shared, and it names no grade/size number the other lacks"""
+    shorter, longer = sorted((tokens_a, tokens_b), key=len)
+    if not shorter:
+        return False
+    if len(shorter & longer) / len(shorter) < MIN_OVERLAP:
+        return False
+    return {t for t in shorter if any(c.isdigit() for c in t)} <= longer
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        self.parent[self.find(a)] = self.find(b)
+
+def cluster_names(names):
+    """Group names (descriptions or filenames) that denote the same product
+
+    Candidate pairs come from an inverted token index that skips very common
+    tokens, so names are only compared with names sharing a distinctive token.
+    """
+    tokens = {name: name_tokens(name) for name in names}
+    index = defaultdict(list)
+    for name, words in tokens.items():
+        for token in words:
+            index[token].append(name)
+    max_postings = max(2, int(len(names) * MAX_TOKEN_SHARE))
+
+    groups = _DisjointSet()
+    for name in names:
+        groups.find(name)
+        shared = Counter()
+        for token in tokens[name]:
+            postings = index[token]
+            if len(postings) <= max_postings:
+                shared.update(other for other in postings if other > name)
+        for other in shared:
+            if same_product(tokens[name], tokens[other]):
+                groups.union(name, other)
+
+    clusters = defaultdict(list)
+    for name in names:
+        clusters[groups.find(name)].append(name)
+    return sorted(sorted(cluster) for cluster in clusters.values())
+
+def _read_rows(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+def _last_date(path):
+    rows = _read_rows(path)
+    return rows[-1]['Date'] if rows else ''
+
+def plan_merges(csv_dir=CSV_DIR, catalog=EXPECTED_PRODUCTS):
+    """Merge plan: [(target filename, [source filenames])] for files holding the same product
+
+    Only clusters of two or more existing files are merged, into the file with
+    the newest circular (the one extraction currently writes; ties go to the
+    largest). Clusters that match several catalog products are ambiguous and
+    skipped. A lone file is never renamed to its catalog spelling, since new
+    circulars would keep writing the extracted name.
+    """
+    filenames = list_csv_files(csv_dir)
+    catalog_tokens = [name_tokens(description) for description in catalog]
+
+    plan = []
+    for cluster in cluster_names(filenames):
+        if len(cluster) < 2:
+            continue
+        matched = {i for name in cluster for i, tokens in enumerate(catalog_tokens)
+                   if same_product(name_tokens(name), tokens)}
+        if len(matched) > 1:
+            continue
+        paths = {name: os.path.join(csv_dir, name) for name in cluster}
+        target = max(cluster, key=lambda name: (_last_date(paths[name]), os.path.getsize(paths[name]), name))
+        plan.append((target, [name for name in cluster if name != target]))
+    return plan
+
+def merge_csv_files(target, sources, csv_dir=CSV_DIR):
+    """Fold sources into target: union by date, target's rows win; sources are removed
+
+    Returns (rows written, conflicting dates where prices differed).
+    """
+    by_date = {}
+    conflicts = []
+    for filename in [target] + sources:
+        for row in _read_rows(os.path.join(csv_dir, filename)):
+            kept = by_date.setdefault(row['Date'], row)
+            if kept is not row and kept['Price'] != row['Price']:
+                conflicts.append(row['Date'])
+
+    rows = [by_date[date] for date in sorted(by_date)]
+    write_csv_atomic(os.path.join(csv_dir, target), rows)
+    for filename in sources:
+        os.remove(os.path.join(csv_dir, filename))
+    return len(rows), conflicts
+
+def merge_duplicate_csvs(csv_dir=CSV_DIR, dry_run=False):
+    """Report duplicate product CSVs and merge them; returns the plan that was (or would be) applied
+
+    The CSVs are snapshotted before anything is merged.
+    """
+    print("🔄 Checking for duplicate CSV files...")
+
+    if not os.path.exists(csv_dir):
+        print("❌ CSV directory not found")
+        return []
+
+    plan = plan_merges(csv_dir)
+    if not plan:
+        print("✅ No duplicate CSV files found")
+        return plan
+
+    for target, sources in plan:
+        print(f"⚠️  Duplicates of {target}:")
+        for source in sources:
+            print(f"   - {source}")
+
+    if dry_run:
+        return plan
+
+    name, _, _ = csv_snapshots.create_snapshot(csv_dir)
+    print(f"📦 Snapshot {name} taken before merging")
+
+    for target, sources in plan:
+        count, conflicts = merge_csv_files(target, sources, csv_dir)
+        print(f"✅ Merged {len(sources)} files into {target} ({count} rows)")
+        if conflicts:
+            print(f"   ⚠️  {len(conflicts)} dates had different prices; kept {target}'s: {', '.join(conflicts[:5])}")
+    return plan
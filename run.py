@@ -5,7 +5,8 @@ Can be run manually or by automated systems
 
 import sys
 import argparse
-from datetime import datetime, timedelta
+from contextlib import nullcontext
+from datetime import datetime
 from downloader import HindalcoPDFDownloader
 import logging
 
@@ -14,44 +15,66 @@ def main():
     parser.add_argument('--date', type=str, help='Download for specific date (YYYY-MM-DD format)')
     parser.add_argument('--scheduler', action='store_true', help='Run in scheduler mode (continuous)')
     parser.add_argument('--backfill', type=int, help='Download missing files for last N days')
+    parser.add_argument('--workers', type=int, help='Concurrent workers for --backfill (default from config)')
+    parser.add_argument('--pipeline', action='store_true', help='Extract and store each PDF as soon as it is downloaded')
+    parser.add_argument('--metrics', action='store_true', help='Collect metrics and export them to the files set in config')
+    parser.add_argument('--trace', type=str, help='With --metrics, also write a span per pipeline stage to this JSON-lines file')
     
     args = parser.parse_args()
     
-    downloader = HindalcoPDFDownloader()
+    if args.metrics:
+        import metrics
+        from config import METRICS_TRACE_FILE
+        metrics.enable(trace_file=args.trace or METRICS_TRACE_FILE)
+    
+    pipeline = None
+    if args.pipeline:
+        from pipeline import IngestPipeline
+        pipeline = IngestPipeline()
+        pipeline.start()
+    on_download = pipeline.submit if pipeline else None
+    
+    try:
+        run(args, on_download, pipeline)
+    finally:
+        if pipeline:
+            # Let queued PDFs finish extracting before exiting
+            from pipeline import print_stage_timings
+            pipeline.close()
+            print_stage_timings(pipeline)
+
+def run(args, on_download=None, pipeline=None):
+    downloader = HindalcoPDFDownloader(on_download=on_download)
     
     if args.scheduler:
         # Start the scheduler
         from scheduler import start_scheduler
-        start_scheduler()
+        start_scheduler(on_download)
     
     elif args.date:
         # Download for specific date
         try:
             target_date = datetime.strptime(args.date, '%Y-%m-%d')
-            success = downloader.download_for_date(target_date)
-            sys.exit(0 if success else 1)
         except ValueError:
             print("Error: Date must be in YYYY-MM-DD format")
             sys.exit(1)
+        with pipeline.stage('download') if pipeline else nullcontext():
+            success = downloader.download_for_date(target_date)
+        sys.exit(0 if success else 1)
     
     elif args.backfill:
-        # Backfill missing files
-        today = datetime.now()
-        success_count = 0
-        
-        for i in range(args.backfill):
-            date = today - timedelta(days=i)
-            success = downloader.download_for_date(date)
-            if success:
-                success_count += 1
+        # Backfill missing files concurrently
+        from backfill import run_backfill, print_backfill_report
+        from config import BACKFILL_WORKERS
         
-        print(f"Backfill completed: {success_count}/{args.backfill} files downloaded")
+        stats = run_backfill(args.backfill, workers=args.workers or BACKFILL_WORKERS, on_download=on_download)
+        print_backfill_report(stats)
         sys.exit(0)
     
     else:
         # Default: download for today
         from downloader import main as download_main
-        download_main()
+        download_main(on_download=on_download)
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,18 @@
 """
 Scheduler for Hindalco PDF Downloader
-Runs the downloader at specified time daily
+Polls around the learned publish window (adaptive) or runs at a fixed time daily
 """
 
+import json
 import schedule
 import time
 import logging
-from datetime import datetime
-from downloader import main as download_main
-from config import DOWNLOAD_TIME, LOG_FILE, LOG_FORMAT, LOG_DATE_FORMAT, LOG_LEVEL
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from downloader import HindalcoPDFDownloader, main as download_main
+from date_index import OUTCOME_DOWNLOADED
+from config import *
+import metrics
 
 # Setup logging
 logging.basicConfig(
@@ -23,14 +27,14 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def scheduled_download():
+def scheduled_download(on_download=None):
     """Wrapper function for scheduled download"""
     logger.info("=" * 50)
     logger.info("SCHEDULED DOWNLOAD STARTED")
     logger.info("=" * 50)
     
     try:
-        download_main()
+        download_main(on_download=on_download)
     except Exception as e:
         logger.error(f"Error during scheduled download: {str(e)}")
     
@@ -38,12 +42,12 @@ def scheduled_download():
     logger.info("SCHEDULED DOWNLOAD COMPLETED")
     logger.info("=" * 50)
 
-def start_scheduler():
-    """Start the scheduler"""
+def start_fixed_scheduler(on_download=None):
+    """Run the downloader once a day at DOWNLOAD_TIME"""
     logger.info(f"Starting scheduler - will run daily at {DOWNLOAD_TIME}")
     
     # Schedule the job
-    schedule.every().day.at(DOWNLOAD_TIME).do(scheduled_download)
+    schedule.every().day.at(DOWNLOAD_TIME).do(scheduled_download, on_download=on_download)
     
     logger.info("Scheduler started. Press Ctrl+C to stop.")
     
@@ -56,5 +60,156 @@ def start_scheduler():
     except Exception as e:
         logger.error(f"Scheduler error: {str(e)}")
 
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _minute_of_day(moment):
+    return moment.hour * 60 + moment.minute + moment.second / 60.0
+
+def _published_at(key, entry):
+    """Local publish time for an index entry: Last-Modified, else capture time, whichever falls on the circular's date
+
+    A backfill captures old circulars days later, so its capture time says nothing about publishing.
+    """
+    if entry.get('last_modified'):
+        try:
+            published = parsedate_to_datetime(entry['last_modified']).astimezone().replace(tzinfo=None)
+            if published.strftime("%Y-%m-%d") == key:
+                return published
+        except (TypeError, ValueError):
+            pass
+    if (entry.get('captured_at') or '').startswith(key):
+        return datetime.fromisoformat(entry['captured_at'])
+    return None
+
+def learn_publish_window(index, now=None):
+    """Learn the typical publish window (minutes of day) from past captures in the date index"""
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=POLL_LEARN_DAYS)).strftime("%Y-%m-%d")
+    samples = []
+
+    for year in index.years():
+        if year < cutoff[:4]:
+            continue
+        for key, entry in index.entries(year).items():
+            if key < cutoff or entry.get('outcome') != OUTCOME_DOWNLOADED:
+                continue
+            published = _published_at(key, entry)
+            if published is not None:
+                samples.append(_minute_of_day(published))
+
+    if len(samples) < POLL_MIN_SAMPLES:
+        start, end = _minutes(POLL_WINDOW_START), _minutes(POLL_WINDOW_END)
+        return {'start': start, 'peak': (start + end) / 2.0, 'end': end, 'samples': len(samples), 'learned': False}
+
+    samples.sort()
+    low = samples[int(0.1 * (len(samples) - 1))]
+    high = samples[int(round(0.9 * (len(samples) - 1)))]
+    return {
+        'start': max(0.0, low - POLL_WINDOW_MARGIN_MINUTES),
+        'peak': samples[len(samples) // 2],
+        'end': min(_minutes(POLL_GIVE_UP_TIME), high + POLL_WINDOW_MARGIN_MINUTES),
+        'samples': len(samples),
+        'learned': True,
+    }
+
+def next_poll_delay(now, window):
+    """Seconds until the next poll: tightest around the typical publish time, sparse at the edges"""
+    minute = _minute_of_day(now)
+    slowest, fastest = POLL_MAX_INTERVAL_MINUTES, POLL_MIN_INTERVAL_MINUTES
+
+    if minute < window['start']:
+        return (window['start'] - minute) * 60
+    if minute <= window['peak']:
+        progress = (minute - window['start']) / max(1.0, window['peak'] - window['start'])
+        return (slowest - (slowest - fastest) * progress) * 60
+    if minute <= window['end']:
+        progress = (minute - window['peak']) / max(1.0, window['end'] - window['peak'])
+        return (fastest + (slowest - fastest) * progress) * 60
+    if minute < _minutes(POLL_GIVE_UP_TIME):
+        return slowest * 60
+    return (24 * 60 - minute + window['start']) * 60
+
+def _format_minutes(minutes):
+    return f"{int(minutes) // 60:02d}:{int(minutes) % 60:02d}"
+
+def record_capture_metrics(index, date, polls, window):
+    """Log and append time-to-capture for today's circular to CAPTURE_METRICS_FILE"""
+    key = date.strftime("%Y-%m-%d")
+    entry = index.get(date) or {}
+    if not entry.get('captured_at', '').startswith(key):
+        return None  # file was already on disk before this polling session
+
+    captured_at = datetime.fromisoformat(entry['captured_at'])
+    published_at = _published_at(key, dict(entry, captured_at=None))
+    record = {
+        'date': key,
+        'captured_at': entry['captured_at'],
+        'published_at': published_at.isoformat(timespec='seconds') if published_at else None,
+        'time_to_capture_s': (captured_at - published_at).total_seconds() if published_at else None,
+        'polls': polls,
+        'window_start': _format_minutes(window['start']),
+        'window_end': _format_minutes(window['end']),
+        'window_learned': window['learned'],
+    }
+    with open(CAPTURE_METRICS_FILE, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+    if record['time_to_capture_s'] is not None:
+        metrics.observe('hindalco_time_to_capture_seconds', record['time_to_capture_s'])
+
+    latency = f"{record['time_to_capture_s']:.0f}s after publish" if published_at else "publish time unknown"
+    logger.info(f"Captured circular for {key} after {polls} polls ({latency})")
+    return record
+
+def start_adaptive_scheduler(on_download=None):
+    """Poll with increasing frequency inside the learned publish window and stop once today's PDF lands"""
+    downloader = HindalcoPDFDownloader(on_download=on_download)
+    window = learn_publish_window(downloader.index)
+    captured_day = None
+    polls = 0
+    logger.info(f"Starting adaptive scheduler - publish window {_format_minutes(window['start'])}-"
+                f"{_format_minutes(window['end'])} ({'learned from ' + str(window['samples']) + ' captures' if window['learned'] else 'default'})")
+    logger.info("Scheduler started. Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            now = datetime.now()
+            if captured_day == now.date() or _minute_of_day(now) >= _minutes(POLL_GIVE_UP_TIME):
+                # Done for today: sleep until tomorrow's window and relearn it with today's result
+                tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+                time.sleep((tomorrow - now).total_seconds() + window['start'] * 60)
+                window = learn_publish_window(downloader.index)
+                polls = 0
+                continue
+
+            if _minute_of_day(now) < window['start']:
+                time.sleep(next_poll_delay(now, window))
+                continue
+
+            polls += 1
+            try:
+                if downloader.download_for_date(now, force_probe=True):
+                    captured_day = now.date()
+                    record_capture_metrics(downloader.index, now, polls, window)
+                    continue
+            except Exception as e:
+                logger.error(f"Error during scheduled download: {str(e)}")
+
+            delay = next_poll_delay(datetime.now(), window)
+            logger.info(f"Circular not published yet, next poll in {delay / 60:.1f} minutes")
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped by user")
+    except Exception as e:
+        logger.error(f"Scheduler error: {str(e)}")
+
+def start_scheduler(on_download=None):
+    """Start the scheduler; on_download(date, filepath) is called for every PDF saved"""
+    if SCHEDULER_MODE == "fixed":
+        start_fixed_scheduler(on_download)
+    else:
+        start_adaptive_scheduler(on_download)
+
 if __name__ == "__main__":
     start_scheduler()
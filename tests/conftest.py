@@ -0,0 +1,45 @@
+"""
+Shared fixtures: tests run in a temporary working directory, since the tools
+read and write csv/, cache/, store/ and the other data directories relative to it
+"""
+
+import os
+import sys
+import glob
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import csv_manager_enhanced
+
+REAL_PDFS = sorted(glob.glob(os.path.join(REPO_ROOT, "Downloads", "**", "*.pdf"), recursive=True))
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """An empty working directory with the CSV manager's per-run date index cleared"""
+    monkeypatch.chdir(tmp_path)
+    csv_manager_enhanced._csv_date_index.clear()
+    csv_manager_enhanced.ensure_directories()
+    yield tmp_path
+    csv_manager_enhanced._csv_date_index.clear()
+
+@pytest.fixture
+def real_csvs(workspace):
+    """csv/ as extraction writes it from the circulars archived under Downloads/"""
+    extracted, _ = csv_manager_enhanced.convert_pdfs(REAL_PDFS)
+    assert len(extracted) == len(REAL_PDFS)
+    return workspace / csv_manager_enhanced.CSV_DIR
+
+@pytest.fixture
+def stub(workspace, request):
+    """(source dir, base_url): the local stub host serving the PDFs placed under source/<year>/<Mon>/
+
+    Parametrize indirectly with a dict of start_stub_server options, e.g. {'drop_after': 1000}.
+    """
+    from benchmarks.stub_server import start_stub_server
+    source = workspace / "server"
+    source.mkdir()
+    server, base_url = start_stub_server(root=str(source), **getattr(request, 'param', {}))
+    yield str(source), base_url
+    server.shutdown()
@@ -0,0 +1,84 @@
+import os
+import glob
+import time
+import asyncio
+import logging
+import pytest
+import async_downloader
+from async_downloader import AsyncHindalcoPDFDownloader
+from date_index import OUTCOME_DOWNLOADED
+from config import PART_SUFFIX
+from benchmarks.synthetic import generate_circulars
+
+ARCHIVE = "Downloads"
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(async_downloader, 'backoff_delay', lambda attempt: 0)
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def target(client, date):
+    return os.path.join(client.create_directory_structure(date), client.construct_filename(date))
+
+def archived(suffix):
+    return glob.glob(os.path.join(ARCHIVE, "**", f"*{suffix}"), recursive=True)
+
+def test_download_range_saves_every_date(stub):
+    source, base_url = stub
+    circulars = generate_circulars(source, 3)
+    start, end = circulars[0][0], circulars[-1][0]
+
+    async def run():
+        async with AsyncHindalcoPDFDownloader(concurrency=2, base_url=base_url, archive_dir=ARCHIVE) as client:
+            return client, await client.download_range(start, end)
+
+    client, results = asyncio.run(run())
+
+    assert results == {date: True for date, _, _ in circulars}
+    for date, served, _ in circulars:
+        assert read(target(client, date)) == read(served)
+        assert client.index.get(date)['outcome'] == OUTCOME_DOWNLOADED
+    assert not archived(PART_SUFFIX)
+
+@pytest.mark.parametrize('stub', [{'drop_after': 1000}], indirect=True)
+def test_dropped_connection_resumes_from_part_file(stub, caplog):
+    source, base_url = stub
+    (date, served, _), = generate_circulars(source, 1)
+
+    async def run():
+        async with AsyncHindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE) as client:
+            return client, await client.fetch_pdf(client.construct_url(date), target(client, date))
+
+    with caplog.at_level(logging.INFO, logger='async_downloader'):
+        client, result = asyncio.run(run())
+
+    assert result['success']
+    assert "Resuming download at byte" in caplog.text
+    assert read(target(client, date)) == read(served)
+    assert result['size'] == os.path.getsize(served)
+    assert not os.path.exists(target(client, date) + PART_SUFFIX)
+
+@pytest.mark.parametrize('stub', [{'stall_after': 1000}], indirect=True)
+def test_cancelled_range_leaves_no_partial_files(stub):
+    source, base_url = stub
+    circulars = generate_circulars(source, 3)
+    start, end = circulars[0][0], circulars[-1][0]
+
+    async def run():
+        async with AsyncHindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE) as client:
+            task = asyncio.create_task(client.download_range(start, end))
+            deadline = time.monotonic() + 5
+            while len(archived(PART_SUFFIX)) < len(circulars) and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert len(archived(PART_SUFFIX)) == len(circulars)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert not asyncio.run(run())
+    assert not archived(PART_SUFFIX)
+    assert not archived(".pdf")
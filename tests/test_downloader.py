@@ -0,0 +1,74 @@
+import os
+import logging
+from datetime import datetime
+import pytest
+import downloader
+from downloader import HindalcoPDFDownloader
+from date_index import OUTCOME_DOWNLOADED, OUTCOME_MISSING
+from config import PART_SUFFIX
+from benchmarks.synthetic import generate_circulars
+
+ARCHIVE = "Downloads"
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(downloader, 'RETRY_DELAY', 0)
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def target(client, date):
+    return os.path.join(client.create_directory_structure(date), client.construct_filename(date))
+
+def test_download_saves_verified_copy(stub):
+    source, base_url = stub
+    (date, served, _), = generate_circulars(source, 1)
+    client = HindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE)
+
+    assert client.download_for_date(date)
+
+    path = target(client, date)
+    assert read(path) == read(served)
+    assert not os.path.exists(path + PART_SUFFIX)
+    assert client.index.get(date)['outcome'] == OUTCOME_DOWNLOADED
+
+@pytest.mark.parametrize('stub', [{'drop_after': 1000}], indirect=True)
+def test_dropped_connection_resumes_with_range(stub, caplog):
+    source, base_url = stub
+    (date, served, _), = generate_circulars(source, 1)
+    client = HindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE)
+
+    with caplog.at_level(logging.INFO, logger='downloader'):
+        result = client.fetch_pdf(client.construct_url(date), target(client, date))
+
+    assert result['success']
+    assert "Resuming download at byte" in caplog.text
+    assert read(target(client, date)) == read(served)
+    assert result['size'] == os.path.getsize(served)
+
+def test_missing_circular_is_recorded_as_missing(stub):
+    _, base_url = stub
+    client = HindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE)
+    date = datetime(2000, 1, 1)
+
+    assert not client.download_for_date(date)
+
+    path = target(client, date)
+    assert not os.path.exists(path) and not os.path.exists(path + PART_SUFFIX)
+    assert client.index.get(date)['outcome'] == OUTCOME_MISSING
+    assert client.fetch_pdf(client.construct_url(date), path)['status'] == 404
+
+def test_unchanged_copy_is_not_modified(stub):
+    source, base_url = stub
+    (date, _, _), = generate_circulars(source, 1)
+    client = HindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE)
+    assert client.download_for_date(date)
+    path = target(client, date)
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    result = client.fetch_pdf(client.construct_url(date), path, validators=client.index.get(date))
+
+    assert result['not_modified'] and not result['success']
+    assert result['status'] == 304
+    assert os.stat(path).st_mtime_ns == mtime_ns
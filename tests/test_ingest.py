@@ -0,0 +1,88 @@
+import os
+import csv
+import shutil
+from datetime import datetime
+import pytest
+import csv_manager_enhanced
+from csv_manager_enhanced import (CSV_DIR, INGEST_MANIFEST_FILE, ingest_archive, load_ingest_manifest, scan_archive,
+                                  ingest_files, record_ingested)
+from product_catalog import EXPECTED_PRODUCTS, create_csv_filename
+from benchmarks.synthetic import build_circular, circular_path, generate_circulars
+
+ARCHIVE = "Downloads"
+FIRST_PRODUCT = create_csv_filename(EXPECTED_PRODUCTS[0])
+
+def prices_of(csv_filename=FIRST_PRODUCT):
+    with open(os.path.join(CSV_DIR, csv_filename), newline='') as f:
+        return {row['Date']: int(row['Price']) for row in csv.DictReader(f)}
+
+def manifest_files():
+    return load_ingest_manifest(INGEST_MANIFEST_FILE)['files']
+
+@pytest.fixture
+def archive(workspace):
+    """Three synthetic circulars, 2000-01-01 to 2000-01-03, ingested once"""
+    circulars = generate_circulars(ARCHIVE, 3)
+    ingest_archive(ARCHIVE)
+    return circulars
+
+def test_ingest_writes_every_circular_once(archive, capsys):
+    assert prices_of() == {date.strftime('%Y-%m-%d'): prices[0] for date, _, prices in archive}
+    assert len(manifest_files()) == 3
+
+    capsys.readouterr()
+    ingest_archive(ARCHIVE)
+    assert "Archive up to date (3 files ingested)" in capsys.readouterr().out
+
+def test_republished_circular_is_ingested_for_its_own_date(archive):
+    _, path, prices = archive[0]
+    republished = circular_path(ARCHIVE, datetime(2000, 1, 4))
+    shutil.copy(path, republished)
+
+    ingest_archive(ARCHIVE)
+
+    assert prices_of()['2000-01-04'] == prices[0]
+    assert manifest_files()[republished]['rows'] == len(EXPECTED_PRODUCTS)
+
+def test_in_place_rewrite_replaces_rows(archive):
+    date, path, prices = archive[1]
+    directory_mtime = os.stat(os.path.dirname(path)).st_mtime_ns
+    with open(path, 'wb') as f:
+        f.write(build_circular(date, [price + 1000 for price in prices]))
+    os.utime(os.path.dirname(path), ns=(directory_mtime, directory_mtime))
+
+    ingest_archive(ARCHIVE)
+
+    assert prices_of()[date.strftime('%Y-%m-%d')] == prices[0] + 1000
+    assert len(prices_of()) == 3
+
+def test_manifest_keeps_entries_recorded_by_another_process(archive, tmp_path):
+    manifest = load_ingest_manifest(INGEST_MANIFEST_FILE)
+    (other,) = generate_circulars(str(tmp_path / "elsewhere"), 1, start=datetime(2001, 1, 1))
+    new = generate_circulars(ARCHIVE, 1, start=datetime(2000, 1, 5))[0]
+
+    changed, removed = scan_archive(ARCHIVE, manifest)
+    record_ingested({other[1]: 7})  # e.g. the pipeline, between our scan and save
+    ingest_files(changed, manifest, INGEST_MANIFEST_FILE, removed)
+
+    assert {other[1], new[1]} <= set(manifest_files())
+    assert set(manifest_files()) == set(manifest['files'])
+
+def test_removed_files_leave_the_manifest(archive):
+    os.remove(archive[2][1])
+    ingest_archive(ARCHIVE)
+    assert archive[2][1] not in manifest_files()
+
+def test_failed_csv_write_is_retried(workspace, monkeypatch):
+    (date, path, prices), = generate_circulars(ARCHIVE, 1)
+
+    def fail(*args):
+        raise OSError("disk full")
+    with monkeypatch.context() as patch:
+        patch.setattr(csv_manager_enhanced, 'write_csv_atomic', fail)
+        ingest_archive(ARCHIVE)
+    assert path not in manifest_files()
+
+    ingest_archive(ARCHIVE)
+    assert prices_of() == {date.strftime('%Y-%m-%d'): prices[0]}
+    assert path in manifest_files()
@@ -0,0 +1,56 @@
+import os
+from datetime import datetime
+import csv_manager_enhanced
+from csv_manager_enhanced import INGEST_MANIFEST_FILE, load_ingest_manifest, record_ingested
+from ingest_daemon import IngestDaemon
+from benchmarks.synthetic import generate_circulars
+
+ARCHIVE = "Downloads"
+
+def manifest_files():
+    return load_ingest_manifest(INGEST_MANIFEST_FILE)['files']
+
+def make_daemon():
+    return IngestDaemon(archive_dir=ARCHIVE, settle_seconds=0, use_watchdog=False)
+
+def ingest(daemon):
+    daemon.poll_directories()
+    return daemon.ingest_ready()
+
+def test_daemon_keeps_entries_recorded_by_another_process(workspace, tmp_path):
+    daemon = make_daemon()
+    (_, first, _), = generate_circulars(ARCHIVE, 1)
+    ingest(daemon)
+
+    (_, other, _), = generate_circulars(str(tmp_path / "elsewhere"), 1, start=datetime(2001, 1, 1))
+    record_ingested({other: 7})  # e.g. the pipeline
+    (_, second, _), = generate_circulars(ARCHIVE, 1, start=datetime(2000, 1, 2))
+    assert ingest(daemon) == 1
+
+    assert {first, second, other} <= set(manifest_files())
+
+def test_daemon_drops_removed_files(workspace):
+    daemon = make_daemon()
+    circulars = generate_circulars(ARCHIVE, 2)
+    ingest(daemon)
+
+    os.remove(circulars[0][1])
+    generate_circulars(ARCHIVE, 1, start=datetime(2000, 1, 3))
+    ingest(daemon)
+
+    assert circulars[0][1] not in manifest_files()
+    assert circulars[1][1] in manifest_files()
+
+def test_daemon_retries_failed_writes(workspace, monkeypatch):
+    daemon = make_daemon()
+    (_, path, _), = generate_circulars(ARCHIVE, 1)
+
+    def fail(*args):
+        raise OSError("disk full")
+    with monkeypatch.context() as patch:
+        patch.setattr(csv_manager_enhanced, 'write_csv_atomic', fail)
+        assert ingest(daemon) == 1
+    assert path not in manifest_files()
+
+    assert ingest(daemon) == 1
+    assert manifest_files()[path]['rows'] == 7
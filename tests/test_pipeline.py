@@ -0,0 +1,82 @@
+import os
+import csv
+import multiprocessing
+import csv_manager_enhanced
+from csv_manager_enhanced import CSV_DIR, INGEST_MANIFEST_FILE, load_ingest_manifest, file_sha256
+from downloader import HindalcoPDFDownloader
+from pipeline import IngestPipeline
+from product_catalog import EXPECTED_PRODUCTS, create_csv_filename
+from benchmarks.synthetic import build_circular, generate_circulars
+
+ARCHIVE = "Downloads"
+FIRST_PRODUCT = create_csv_filename(EXPECTED_PRODUCTS[0])
+
+def prices_of(csv_filename=FIRST_PRODUCT):
+    with open(os.path.join(CSV_DIR, csv_filename), newline='') as f:
+        return {row['Date']: int(row['Price']) for row in csv.DictReader(f)}
+
+def manifest_files():
+    return load_ingest_manifest(INGEST_MANIFEST_FILE)['files']
+
+def download(base_url, dates):
+    """Download dates through a pipeline; returns the archived paths"""
+    with IngestPipeline() as pipeline:
+        downloader = HindalcoPDFDownloader(base_url=base_url, archive_dir=ARCHIVE, on_download=pipeline.submit)
+        for date in dates:
+            assert downloader.download_for_date(date)
+    return [os.path.join(downloader.create_directory_structure(date), downloader.construct_filename(date))
+            for date in dates]
+
+def test_downloads_are_stored_and_recorded(stub):
+    source, base_url = stub
+    circulars = generate_circulars(source, 2)
+
+    paths = download(base_url, [date for date, _, _ in circulars])
+
+    assert prices_of() == {date.strftime('%Y-%m-%d'): prices[0] for date, _, prices in circulars}
+    files = manifest_files()
+    assert [files[path]['rows'] for path in paths] == [len(EXPECTED_PRODUCTS)] * 2
+    assert files[paths[0]]['date'] == '2000-01-01'
+
+def test_refreshed_copy_replaces_rows(stub):
+    source, base_url = stub
+    (date, _, prices), = generate_circulars(source, 1)
+    path, = download(base_url, [date])
+
+    # The server republishes the circular with corrected prices and revalidation fetches it
+    with open(path, 'wb') as f:
+        f.write(build_circular(date, [price + 500 for price in prices]))
+    with IngestPipeline() as pipeline:
+        pipeline.submit(date, path)
+
+    assert prices_of() == {'2000-01-01': prices[0] + 500}
+    assert manifest_files()[path]['sha256'] == file_sha256(path)
+
+def test_failed_write_is_not_recorded(stub, monkeypatch):
+    source, base_url = stub
+    (date, _, _), = generate_circulars(source, 1)
+
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(csv_manager_enhanced, 'write_csv_atomic', fail)
+    path, = download(base_url, [date])
+
+    assert os.path.exists(path)
+    assert path not in manifest_files()
+
+def commit_dates(first_day, days):
+    writer = csv_manager_enhanced.CsvBatchWriter()
+    for day in range(first_day, first_day + days):
+        writer.add({'date': f"2000-01-{day:02d}", 'description': EXPECTED_PRODUCTS[0], 'price': 1000 + day},
+                   FIRST_PRODUCT)
+        written, failed = writer.commit()
+        assert written and not failed
+
+def test_concurrent_commits_keep_every_row(workspace):
+    workers = [multiprocessing.Process(target=commit_dates, args=(first_day, 10)) for first_day in (1, 11, 21)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert prices_of() == {f"2000-01-{day:02d}": 1000 + day for day in range(1, 31)}
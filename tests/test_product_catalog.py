@@ -0,0 +1,29 @@
+import csv
+from product_catalog import plan_merges, merge_duplicate_csvs
+from csv_tools import list_csv_files, write_csv_atomic
+
+BILLETS = "6_Billets_AA6063_Dia_7_8_9_-_subject_to_availabili.csv"
+BILLETS_CATALOG_SPELLING = "Billets_AA6063_Dia_7_8_9_-_subject_to_availability.csv"
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_extracted_products_are_not_merged(real_csvs):
+    assert len(list_csv_files(real_csvs)) == 7
+    assert plan_merges(real_csvs) == []
+
+def test_near_duplicate_merges_into_extracted_file(real_csvs):
+    extracted = read_rows(real_csvs / BILLETS)
+    write_csv_atomic(str(real_csvs / BILLETS_CATALOG_SPELLING), [
+        {'Date': '2025-01-02', 'Description': 'Billets (AA6063) Dia 7", 8" & 9" - subject to availability',
+         'Price': '280000'},
+    ])
+
+    assert plan_merges(real_csvs) == [(BILLETS, [BILLETS_CATALOG_SPELLING])]
+    merge_duplicate_csvs(str(real_csvs))
+
+    assert not (real_csvs / BILLETS_CATALOG_SPELLING).exists()
+    merged = read_rows(real_csvs / BILLETS)
+    assert [row['Date'] for row in merged] == ['2025-01-02'] + [row['Date'] for row in extracted]
+    assert plan_merges(real_csvs) == []
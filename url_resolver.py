@@ -0,0 +1,107 @@
+"""
+URL template resolver for Hindalco PDF Downloader
+Ranks the configured URL templates by historical hit rate and remembers the winner per month
+"""
+
+import os
+import json
+import threading
+from file_lock import file_lock
+from config import ARCHIVE_DIR, URL_TEMPLATES, URL_PATTERN_STATS_FILE, URL_PATTERN_MAX_CANDIDATES, URL_PATTERN_PRUNE_AFTER
+
+def template_fields(date):
+    """Every spelling of date a URL template may reference"""
+    return {
+        'day': date.strftime("%d"),
+        'day_nopad': str(date.day),
+        'month': date.strftime("%B").lower(),
+        'Month': date.strftime("%B"),
+        'mon': date.strftime("%b").lower(),
+        'Mon': date.strftime("%b"),
+        'year': date.strftime("%Y"),
+        'yy': date.strftime("%y"),
+    }
+
+def render_template(template, date):
+    """Fill a template; positional {} placeholders keep the legacy BASE_URL day, month, year order"""
+    fields = template_fields(date)
+    return template.format(fields['day'], fields['month'], fields['year'], **fields)
+
+class UrlResolver:
+    """Hit-rate ranking of URL templates, persisted to Downloads/url_patterns.json
+
+    The scheduler, backfill and the async client may share the file, so each
+    record re-reads it under a file lock and adds to the counts found there.
+    """
+
+    def __init__(self, templates=None, root=ARCHIVE_DIR):
+        self.templates = list(templates or URL_TEMPLATES)
+        self.path = os.path.join(root, URL_PATTERN_STATS_FILE)
+        self.lock = threading.Lock()
+        self.stats = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        stats.setdefault('templates', {})
+        stats.setdefault('periods', {})
+        return stats
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stats, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _score(self, template):
+        counts = self.stats['templates'].get(template, {})
+        # Laplace-smoothed hit rate; ties keep the configured order
+        return (counts.get('hits', 0) + 1) / (counts.get('tries', 0) + 2)
+
+    def _pruned(self, template):
+        counts = self.stats['templates'].get(template, {})
+        return counts.get('hits', 0) == 0 and counts.get('tries', 0) >= URL_PATTERN_PRUNE_AFTER
+
+    def ranked_templates(self, date):
+        """Templates to try for date, best first
+
+        Once a template has produced a hit in a month, only that template is tried
+        for the rest of the month, so days without a circular cost one request.
+        """
+        with self.lock:
+            winner = self.stats['periods'].get(date.strftime("%Y-%m"))
+            if winner in self.templates:
+                return [winner]
+            if len(self.templates) == 1:
+                return list(self.templates)
+            ranked = sorted(self.templates, key=lambda t: (-self._score(t), self.templates.index(t)))
+            return [t for t in ranked if not self._pruned(t)] or ranked[:1]
+
+    def candidates(self, date):
+        """(template, url) pairs to try for date, best first, at most URL_PATTERN_MAX_CANDIDATES
+
+        Templates that render the same URL for this date (e.g. {day} and
+        {day_nopad} from the 10th on) are tried once, under the better-ranked template.
+        """
+        candidates, seen = [], set()
+        for template in self.ranked_templates(date):
+            url = render_template(template, date)
+            if url not in seen:
+                seen.add(url)
+                candidates.append((template, url))
+        return candidates[:URL_PATTERN_MAX_CANDIDATES]
+
+    def record(self, date, template, hit):
+        """Count one definitive try (hit or 404) of template for date"""
+        with self.lock, file_lock(self.path):
+            self.stats = self._load()
+            counts = self.stats['templates'].setdefault(template, {'tries': 0, 'hits': 0})
+            counts['tries'] += 1
+            if hit:
+                counts['hits'] += 1
+                self.stats['periods'][date.strftime("%Y-%m")] = template
+            self._save()